@@ -0,0 +1,137 @@
+import os
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+
+# Approximate nearest-neighbour search over the TF-IDF resource vectors, pure NumPy.
+# TF-IDF rows are projected to `dims` dense dimensions with TruncatedSVD (LSA)
+# and grouped into `n_lists` clusters by spherical k-means (an IVF index). A
+# query only scores the vectors in its `nprobe` closest clusters.
+#
+# Files (in the resource index directory, all memmapped on load):
+#   ann_components.npy  (dims, n_terms)  SVD projection
+#   ann_centroids.npy   (n_lists, dims)  cluster centroids
+#   ann_vectors.npy     (n, dims)        projected rows, grouped by cluster
+#   ann_ids.npy         (n,)             resource row of each vector
+#   ann_offsets.npy     (n_lists + 1,)   cluster c is vectors[offsets[c]:offsets[c + 1]]
+ANN_DIMS = int(os.getenv("ANN_DIMS", "128"))
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "16"))
+ANN_FILES = ("components", "centroids", "vectors", "ids", "offsets")
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# Nearest centroid (by cosine) for every row, in chunks to bound memory
+def _assign(vectors, centroids, chunk=65536):
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk):
+        labels[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors, n_lists, iters=10, seed=0):
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(iters):
+        labels = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        empty = ~sums.any(axis=1)
+        # Clusters that lost every point restart from random rows
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    def __init__(self, components, centroids, vectors, ids, offsets, nprobe=ANN_NPROBE):
+        self.components = components
+        self.centroids = centroids
+        self.vectors = vectors
+        self.ids = ids
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    # === Build from the (n, n_terms) TF-IDF matrix ===
+    # The SVD and k-means are fitted on a sample of `sample` rows; every row is
+    # then projected and assigned. n_lists defaults to about 4 * sqrt(n).
+    @classmethod
+    def fit(cls, matrix, dims=ANN_DIMS, n_lists=None, sample=200_000, iters=10, seed=0, nprobe=ANN_NPROBE):
+        n = matrix.shape[0]
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(n, min(n, sample), replace=False))
+        dims = min(dims, matrix.shape[1] - 1, len(sample_rows) - 1)
+
+        svd = TruncatedSVD(n_components=dims, n_iter=5, random_state=seed)
+        svd.fit(matrix[sample_rows])
+        components = svd.components_.astype(np.float32)
+
+        index = cls(components, None, None, None, None, nprobe)
+        vectors = index.project(matrix)
+        n_lists = n_lists or max(1, min(int(4 * np.sqrt(n)), len(sample_rows) // 8))
+        index.centroids = spherical_kmeans(vectors[sample_rows], n_lists, iters, seed)
+
+        labels = _assign(vectors, index.centroids)
+        order = np.argsort(labels, kind="stable")
+        index.vectors = vectors[order]
+        index.ids = order.astype(np.int64)
+        index.offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=n_lists))]).astype(np.int64)
+        return index
+
+    # Sparse TF-IDF rows -> unit-length dense vectors
+    def project(self, matrix, chunk=65536):
+        out = np.empty((matrix.shape[0], self.components.shape[0]), dtype=np.float32)
+        for start in range(0, matrix.shape[0], chunk):
+            out[start:start + chunk] = matrix[start:start + chunk] @ self.components.T
+        return _normalize(out)
+
+    # === Candidate rows for each query ===
+    # Returns, per query, up to `n_candidates` resource rows with the best
+    # projected scores inside the probed clusters. `mask` (bool per row) drops
+    # filtered-out rows before the cut.
+    def search(self, query_matrix, n_candidates, nprobe=None, mask=None):
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        queries = self.project(query_matrix)
+        centroid_scores = queries @ self.centroids.T
+        probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+
+        results = []
+        for query, probe in zip(queries, probes):
+            # Positions of every vector in the probed clusters, gathered in one go
+            starts, ends = self.offsets[probe], self.offsets[probe + 1]
+            lengths = ends - starts
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            ids = self.ids[positions]
+            scores = self.vectors[positions] @ query
+            if mask is not None:
+                keep = mask[ids]
+                ids, scores = ids[keep], scores[keep]
+            if len(ids) > n_candidates:
+                ids = ids[np.argpartition(-scores, n_candidates - 1)[:n_candidates]]
+            results.append(ids)
+        return results
+
+    # === Persistence ===
+    def save(self, path):
+        for name in ANN_FILES:
+            np.save(os.path.join(path, f"ann_{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, path, mmap=True, nprobe=ANN_NPROBE):
+        mode = "r" if mmap else None
+        arrays = [np.load(os.path.join(path, f"ann_{name}.npy"), mmap_mode=mode) for name in ANN_FILES]
+        return cls(*arrays, nprobe=nprobe)
+
+    @staticmethod
+    def exists(path):
+        return all(os.path.exists(os.path.join(path, f"ann_{name}.npy")) for name in ANN_FILES)
+
+    @staticmethod
+    def remove(path):
+        for name in ANN_FILES:
+            file_path = os.path.join(path, f"ann_{name}.npy")
+            if os.path.exists(file_path):
+                os.remove(file_path)
@@ -3,19 +3,43 @@
 from fastapi import FastAPI, Request
 from pydantic import BaseModel
 from typing import List, Optional
-import pandas as pd
+import os
+import sys
 import random
 import torch
-from transformers import pipeline
+
+# Add the repository root to system path for the shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared.micro_batcher import MicroBatcher, split_batches
+from learning_store import LearningStore
+from feed import analyze_feedback_batch, get_pipeline
 
 app = FastAPI()
 
-# === Load Dataset (Optional: Replace with DB) ===
-data_path = "edtech_adaptive_learning_dataset.csv"
-df = pd.read_csv(data_path)
+# === Learning Data Store (SQLite, seeded from the CSV on first run) ===
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+data_path = os.path.join(BASE_DIR, "edtech_adaptive_learning_dataset.csv")
+db_path = os.getenv("LEARNING_DB", os.path.join(BASE_DIR, "edtech_learning.sqlite3"))
+store = LearningStore(db_path, seed_csv=data_path, max_wait_ms=float(os.getenv("WRITE_BATCH_MS", "5")))
+
+
+# === Sentiment Analysis Model (loaded and run on the batcher's worker thread) ===
+# Concurrent /analyze_feedback requests are grouped into one forward pass
+sentiment = MicroBatcher(split_batches(analyze_feedback_batch), setup_fn=get_pipeline,
+                         max_batch_size=int(os.getenv("SENTIMENT_MAX_BATCH", "64")),
+                         max_wait_ms=float(os.getenv("SENTIMENT_BATCH_MS", "5")), name="sentiment-worker")
+
+
+@app.on_event("startup")
+def start_workers():
+    store.start()
+    sentiment.start()
+
 
-# === Load Sentiment Analysis Model ===
-sentiment_analyzer = pipeline("sentiment-analysis")
+@app.on_event("shutdown")
+def stop_workers():
+    store.stop()  # flushes queued submissions
+    sentiment.stop()
 
 # === Pydantic Models ===
 class UserLearningData(BaseModel):
@@ -30,25 +54,31 @@ class UserLearningData(BaseModel):
 class FeedbackText(BaseModel):
     feedback: str
 
+class FeedbackBatch(BaseModel):
+    feedbacks: List[str]
+
 # === Route: Submit User Learning Data ===
+# Appended by the store's writer thread; the response is sent once the row is committed
 @app.post("/submit_data")
-def submit_learning_data(data: UserLearningData):
-    global df
-    new_data = pd.DataFrame([data.dict()])
-    df = pd.concat([df, new_data], ignore_index=True)
-    df.to_csv(data_path, index=False)
+async def submit_learning_data(data: UserLearningData):
+    await store.submit(data.dict())
     return {"message": "Data submitted successfully."}
 
+@app.get("/store_metrics")
+def store_metrics():
+    return {"rows": store.count(), **store.metrics()}
+
 # === Route: Get Recommendations ===
 @app.get("/get_recommendations/{user_id}")
 def get_recommendations(user_id: int):
-    user_data = df[df['user_id'] == user_id]
-    if user_data.empty:
+    # Seen topics, global topics and score means come from the store's per-user
+    # index, so these lookups take the same time however big the dataset gets
+    seen_topics = store.user_topics(user_id)
+    if not seen_topics:
         return {"message": "User not found."}
     
     # Simple logic: Recommend topics not yet seen
-    seen_topics = user_data['topic'].unique().tolist()
-    all_topics = df['topic'].unique().tolist()
+    all_topics = store.topics()
     unseen_topics = list(set(all_topics) - set(seen_topics))
     if not unseen_topics:
         unseen_topics = all_topics
@@ -58,19 +88,27 @@ def get_recommendations(user_id: int):
 
 # === Route: Analyze Feedback Sentiment ===
 @app.post("/analyze_feedback")
-def analyze_feedback(feedback: FeedbackText):
-    result = sentiment_analyzer(feedback.feedback)
-    return {"feedback_sentiment": result[0]}
+async def analyze_feedback(feedback: FeedbackText):
+    result = (await sentiment.submit([feedback.feedback]))[0]
+    return {"feedback_sentiment": result}
+
+# === Route: Analyze a Batch of Feedback (e.g. after a class session) ===
+@app.post("/analyze_feedback_batch")
+async def analyze_feedback_batch_route(batch: FeedbackBatch):
+    results = await sentiment.submit(batch.feedbacks, len(batch.feedbacks)) if batch.feedbacks else []
+    return {"feedback_sentiments": results}
+
+@app.get("/sentiment_metrics")
+def sentiment_metrics():
+    return sentiment.metrics()
 
 # === Route: Adaptive Assessment Generator ===
 @app.get("/adaptive_assessment/{user_id}")
 def adaptive_assessment(user_id: int):
-    user_data = df[df['user_id'] == user_id]
-    if user_data.empty:
+    avg_score, count = store.user_score(user_id)
+    if count == 0:
         return {"message": "User not found."}
 
-    avg_score = user_data['quiz_score'].mean()
-
     # Simulate difficulty level based on avg score
     if avg_score >= 80:
         difficulty = "Advanced"
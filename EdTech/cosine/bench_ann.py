@@ -0,0 +1,85 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from resource_index import ResourceIndex
+from bench_recommendations import SUBJECTS, DIFFICULTIES, N_WORDS
+
+# Recall@k and QPS of the ANN mode against exact search on a synthetic catalog.
+# python bench_ann.py [100000 1000000]
+#
+# Unlike bench_recommendations.py (words drawn independently), resources here
+# are about topics: each topic has its own Zipf-weighted word list and 70% of a
+# resource's words come from its topic, as in a real course catalog. This is
+# the structure the SVD projection relies on.
+N_TOPICS = 300
+TOPIC_WORDS = 60
+TOP_K = 10
+
+
+class TopicCorpus:
+    def __init__(self, rng):
+        self.rng = rng
+        self.topic_words = rng.choice(N_WORDS, size=(N_TOPICS, TOPIC_WORDS))
+        self.topic_weights = 1.0 / np.arange(1, TOPIC_WORDS + 1)
+        self.topic_weights /= self.topic_weights.sum()
+        self.global_weights = 1.0 / (np.arange(1, N_WORDS + 1) + 20) ** 1.05
+        self.global_weights /= self.global_weights.sum()
+        self.words = np.array([f"w{i}" for i in range(N_WORDS)])
+
+    def sample(self, topics, length, topic_share=0.7):
+        picks = self.rng.choice(TOPIC_WORDS, size=(len(topics), length), p=self.topic_weights)
+        words = self.topic_words[topics[:, None], picks]
+        background = self.rng.random((len(topics), length)) >= topic_share
+        words[background] = self.rng.choice(N_WORDS, size=int(background.sum()), p=self.global_weights)
+        return [" ".join(row) for row in self.words[words]]
+
+    def resources(self, n):
+        topics = self.rng.integers(0, N_TOPICS, n)
+        return pd.DataFrame({
+            "subject": self.rng.choice(SUBJECTS, n),
+            "title": self.sample(topics, 3),
+            "url": [f"https://example.com/resource_{i}" for i in range(n)],
+            "difficulty": self.rng.choice(DIFFICULTIES, n),
+            "type": self.rng.choice(["video", "article", "quiz"], n),
+            "description": self.sample(topics, 10),
+        })
+
+    def queries(self, n):
+        return self.sample(self.rng.integers(0, N_TOPICS, n), 4, topic_share=0.9)
+
+
+# Share of the exact top-k found by ANN; any result scoring at least the exact
+# k-th score counts, so ties at the cut-off are not held against it
+def recall_at_k(approx, exact):
+    hits = [np.sum(a_scores >= e_scores[-1] - 1e-6) / len(e_scores)
+            for (_, a_scores), (_, e_scores) in zip(approx, exact) if e_scores[-1] > 0]
+    return float(np.mean(hits))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    corpus = TopicCorpus(np.random.default_rng(0))
+    queries = corpus.queries(500)
+
+    for n in sizes:
+        index, fit_s = timed(lambda: ResourceIndex.from_frame(corpus.resources(n), ann=False))
+        _, ann_s = timed(index.build_ann)
+        exact, exact_s = timed(lambda: index.search_many(queries, top_k=TOP_K, mode="exact"))
+        print(f"\n📚 {n} resources: TF-IDF fit {fit_s:.1f}s, ANN build {ann_s:.1f}s, "
+              f"exact {len(queries) / exact_s:.0f} qps")
+
+        print(f"{'nprobe':>7} {f'recall@{TOP_K}':>10} {'qps':>8} {'speedup':>8}")
+        for nprobe in (4, 8, 16, 32, 64):
+            approx, ann_s = timed(lambda: index.search_many(queries, top_k=TOP_K, mode="ann", nprobe=nprobe))
+            print(f"{nprobe:>7} {recall_at_k(approx, exact):>10.3f} {len(queries) / ann_s:>8.0f} "
+                  f"{exact_s / ann_s:>7.1f}x")
+
+        mode = "ann" if index.use_ann() else "exact"
+        print(f"🔀 mode='auto' picks {mode} (ANN only with RESOURCE_INDEX_ANN=1)")
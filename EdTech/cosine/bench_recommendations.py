@@ -0,0 +1,83 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sklearn.metrics.pairwise import cosine_similarity
+from resource_index import ResourceIndex
+
+# Benchmark: batched top-k search vs the old one-query-at-a-time full sort on
+# synthetic catalogs.  python bench_recommendations.py [100000 1000000]
+
+SUBJECTS = ["Math", "Science", "Biology", "Chemistry", "Physics", "History", "Geography",
+            "English", "Computer Science", "Economics"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+N_WORDS = 50_000
+
+
+# Words follow a Zipf-Mandelbrot frequency curve, as real course text does once
+# the stop-word list has cut off the head of the distribution
+def word_sampler(rng):
+    weights = 1.0 / (np.arange(1, N_WORDS + 1) + 20) ** 1.05
+    weights /= weights.sum()
+    words = np.array([f"w{i}" for i in range(N_WORDS)])
+    return lambda size: words[rng.choice(N_WORDS, size=size, p=weights)]
+
+
+def synthetic_resources(n, rng, sample_words):
+    title_words = sample_words((n, 3))
+    description_words = sample_words((n, 10))
+    return pd.DataFrame({
+        "subject": rng.choice(SUBJECTS, n),
+        "title": [" ".join(words) for words in title_words],
+        "url": [f"https://example.com/resource_{i}" for i in range(n)],
+        "difficulty": rng.choice(DIFFICULTIES, n),
+        "type": rng.choice(["video", "article", "quiz"], n),
+        "description": [" ".join(words) for words in description_words],
+    })
+
+
+# === Previous implementation (cs.py before the resource index), minus the fit ===
+def legacy_recommend(index, df, user_query, top_n=5):
+    query_vector, _, _ = index.transform([user_query])
+    similarities = cosine_similarity(query_vector, index.matrix).flatten()
+    top_indices = similarities.argsort()[-top_n:][::-1]
+    return df[['title', 'url', 'subject', 'difficulty', 'description']].iloc[top_indices].to_dict(orient='records')
+
+
+def qps(fn, n_queries):
+    start = time.perf_counter()
+    fn()
+    return n_queries / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    rng = np.random.default_rng(0)
+    sample_words = word_sampler(rng)
+    queries = [" ".join(words) for words in sample_words((512, 4))]
+    fields = ['title', 'url', 'subject', 'difficulty', 'description']
+
+    print(f"{'resources':>10} {'build s':>8} {'legacy qps':>11} {'single qps':>11} "
+          f"{'batch qps':>10} {'filtered qps':>13} {'speedup':>8}")
+    for n in sizes:
+        resources = synthetic_resources(n, rng, sample_words)
+        start = time.perf_counter()
+        index = ResourceIndex.from_frame(resources, ann=False)
+        build_s = time.perf_counter() - start
+
+        legacy = qps(lambda: [legacy_recommend(index, resources, q) for q in queries[:20]], 20)
+        single = qps(lambda: [index.records(index.search(q)[0], fields) for q in queries[:100]], 100)
+        batch = qps(lambda: [index.records(rows, fields) for rows, _ in index.search_many(queries, top_k=5)],
+                    len(queries))
+        index.filter_mask("Math", ["easy", "medium"])  # masks are built once, outside the timing
+        filtered = qps(lambda: index.search_many(queries, top_k=5, subject="Math", difficulty=["easy", "medium"]),
+                       len(queries))
+
+        # Same scores as the full sort (ties may come back in a different order)
+        for query in queries[:20]:
+            expected = cosine_similarity(index.transform([query])[0], index.matrix).ravel()
+            _, scores = index.search(query)
+            assert np.allclose(scores, np.sort(expected)[::-1][:5], atol=1e-5)
+
+        print(f"{n:>10} {build_s:>8.1f} {legacy:>11.1f} {single:>11.1f} {batch:>10.1f} "
+              f"{filtered:>13.1f} {batch / legacy:>7.1f}x")
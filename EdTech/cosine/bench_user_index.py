@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+import numpy as np
+import pandas as pd
+from learning_store import LearningStore, UserIndex, INSERT_SQL
+
+# Benchmark: per-user lookups behind /get_recommendations and /adaptive_assessment
+# at growing dataset sizes.  python bench_user_index.py [1000000 10000000]
+#   legacy: boolean scan of the full DataFrame + df['topic'].unique() (old api.py)
+#   sql:    indexed SQLite queries (DISTINCT topic needs a full index scan)
+#   index:  UserIndex in memory
+N_USERS = 200_000
+TOPICS = [f"Topic {i}" for i in range(40)]
+
+
+def fill(db_path, n_rows, chunk=500_000, seed=0):
+    rng = np.random.default_rng(seed + n_rows)
+    db = sqlite3.connect(db_path)
+    db.execute("PRAGMA synchronous=OFF")
+    now = time.time()
+    for start in range(0, n_rows, chunk):
+        size = min(chunk, n_rows - start)
+        users = rng.integers(100, 100 + N_USERS, size).tolist()
+        topics = rng.integers(0, len(TOPICS), size).tolist()
+        scores = rng.integers(0, 101, size).tolist()
+        with db:
+            db.executemany(INSERT_SQL, ((u, TOPICS[t], 30, s, "Visual", "ok", 4, now)
+                                        for u, t, s in zip(users, topics, scores)))
+    db.close()
+
+
+def legacy_lookup(df, user_id):
+    user_data = df[df['user_id'] == user_id]
+    seen_topics = user_data['topic'].unique().tolist()
+    all_topics = df['topic'].unique().tolist()
+    return seen_topics, all_topics, user_data['quiz_score'].mean()
+
+
+def sql_lookup(db, user_id):
+    seen_topics = [row[0] for row in db.execute("SELECT DISTINCT topic FROM learning_data WHERE user_id = ?", (user_id,))]
+    all_topics = [row[0] for row in db.execute("SELECT DISTINCT topic FROM learning_data")]
+    avg_score = db.execute("SELECT AVG(quiz_score) FROM learning_data WHERE user_id = ?", (user_id,)).fetchone()[0]
+    return seen_topics, all_topics, avg_score
+
+
+def index_lookup(index, user_id):
+    return index.user_topics(user_id), index.all_topics(), index.user_score(user_id)[0]
+
+
+def per_call_ms(fn, users):
+    start = time.perf_counter()
+    for user_id in users:
+        fn(user_id)
+    return (time.perf_counter() - start) * 1000 / len(users)
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000_000, 10_000_000]
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_learning.sqlite3")
+    LearningStore(db_path)  # creates the table and indexes
+    rng = random.Random(0)
+
+    print(f"{'rows':>10} {'legacy ms':>10} {'sql ms':>8} {'index ms':>9} {'index build s':>14} {'sync 1k rows ms':>16}")
+    rows = 0
+    for n in sizes:
+        fill(db_path, n - rows)
+        rows = n
+        with sqlite3.connect(db_path) as db:
+            users = [db.execute("SELECT user_id FROM learning_data WHERE id = ?", (rng.randint(1, rows),)).fetchone()[0]
+                     for _ in range(20)]
+            df = pd.read_sql_query("SELECT user_id, topic, quiz_score FROM learning_data", db)
+            legacy_ms = per_call_ms(lambda user_id: legacy_lookup(df, user_id), users)
+            sql_ms = per_call_ms(lambda user_id: sql_lookup(db, user_id), users)
+            del df
+
+        index = UserIndex(db_path)
+        index_ms = per_call_ms(lambda user_id: index_lookup(index, user_id), users * 500)
+
+        # Same answers as the table itself
+        with sqlite3.connect(db_path) as db:
+            for user_id in users:
+                seen, all_topics, avg = sql_lookup(db, user_id)
+                assert sorted(index.user_topics(user_id)) == sorted(seen)
+                assert sorted(index.all_topics()) == sorted(all_topics)
+                assert abs(index.user_score(user_id)[0] - avg) < 1e-9
+
+        # Incremental update: rows written after the index was built
+        fill(db_path, 1000, seed=n)
+        rows += 1000
+        start = time.perf_counter()
+        index.sync()
+        sync_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{n:>10} {legacy_ms:>10.1f} {sql_ms:>8.1f} {index_ms:>9.4f} {index.build_seconds:>14.1f} {sync_ms:>16.2f}")
+        del index
@@ -1,30 +1,33 @@
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+from resource_index import ResourceIndex
 
-# Load data
-df = pd.read_csv("learning_resources_large.csv")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESOURCES_CSV = os.getenv("RESOURCES_CSV", os.path.join(BASE_DIR, "learning_resources_large.csv"))
+INDEX_DIR = os.getenv("RESOURCE_INDEX_DIR", os.path.join(BASE_DIR, "resource_index"))
 
-# Combine text fields
-df['text'] = df['title'] + " " + df['description'] + " " + df['subject']
+# Load the persisted TF-IDF index (memory-mapped); it is fitted only on the
+# first run or when the CSV changes. See resource_index.py.
+index = ResourceIndex.open(RESOURCES_CSV, INDEX_DIR)
+
+
+# ➕ Add new resources without refitting (rebuilds itself once drift is too high)
+def add_resources(resources):
+    return index.add(resources)
+
+
+RESULT_FIELDS = ['title', 'url', 'subject', 'difficulty', 'description']
+
+
+# 🔍 Batched version: many free-text queries in one pass, optionally filtered by
+# subject and/or difficulty (a value or a list of values)
+def get_recommendations_from_queries(user_queries, top_n=5, subject=None, difficulty=None):
+    results = index.search_many(user_queries, top_k=top_n, subject=subject, difficulty=difficulty)
+    return [index.records(rows, RESULT_FIELDS) for rows, _ in results]
 
-# Fit TF-IDF on resource text
-vectorizer = TfidfVectorizer(stop_words='english')
-tfidf_matrix = vectorizer.fit_transform(df['text'])
 
 # 🔍 New Function: Recommend based on free-text query
-def get_recommendations_from_query(user_query, top_n=5):
-    # Transform the user query into the same TF-IDF space
-    query_vector = vectorizer.transform([user_query])
-    
-    # Compute cosine similarity between user query and all resources
-    similarities = cosine_similarity(query_vector, tfidf_matrix).flatten()
-    
-    # Get top N indices
-    top_indices = similarities.argsort()[-top_n:][::-1]
-    
-    # Return recommended items
-    return df[['title', 'url', 'subject', 'difficulty', 'description']].iloc[top_indices].to_dict(orient='records')
+def get_recommendations_from_query(user_query, top_n=5, subject=None, difficulty=None):
+    return get_recommendations_from_queries([user_query], top_n, subject, difficulty)[0]
 
 if __name__ == "__main__":
     query = "I want to learn about algebra or math equations"
@@ -32,6 +35,7 @@ if __name__ == "__main__":
     for res in results:
         print(res)
 
-
-
-
+    # Filtered batch
+    for query, recs in zip(["chemistry basics", "history topic"],
+                           get_recommendations_from_queries(["chemistry basics", "history topic"], top_n=2, difficulty="easy")):
+        print(f"{query}: {[rec['title'] for rec in recs]}")
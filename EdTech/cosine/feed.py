@@ -1,16 +1,73 @@
+import os
+import sys
+import time
+import torch
 from transformers import pipeline
 
-# Load sentiment pipeline
-sentiment_pipeline = pipeline("sentiment-analysis")
+# === Sentiment model settings ===
+# SENTIMENT_THREADS: torch intra-op thread count (0 keeps torch's default). This
+#                    is process-wide, not per worker: it caps every torch op in
+#                    the process, which in the API is only the sentiment model,
+#                    and leaves the remaining cores to the request threads.
+# SENTIMENT_BATCH:   texts per forward pass
+SENTIMENT_THREADS = int(os.getenv("SENTIMENT_THREADS", "0"))
+SENTIMENT_BATCH = int(os.getenv("SENTIMENT_BATCH", "32"))
+
+sentiment_pipeline = None
+
+
+# Load sentiment pipeline on first use
+def get_pipeline():
+    global sentiment_pipeline
+    if sentiment_pipeline is None:
+        if SENTIMENT_THREADS > 0:
+            torch.set_num_threads(SENTIMENT_THREADS)
+        sentiment_pipeline = pipeline("sentiment-analysis")
+    return sentiment_pipeline
+
+
+# Analyze many feedback texts in one go; returns [{"label", "score"}] in input order.
+# Texts are sorted by length first so each forward pass pads to similar lengths,
+# and long texts are truncated to the model's limit instead of failing.
+def analyze_feedback_batch(texts, batch_size=SENTIMENT_BATCH):
+    if not texts:
+        return []
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    with torch.inference_mode():
+        scored = get_pipeline()([texts[i] for i in order], batch_size=batch_size, truncation=True)
+    results = [None] * len(texts)
+    for i, result in zip(order, scored):
+        results[i] = result
+    return results
+
 
 # Analyze feedback text
 def analyze_feedback(feedback_text):
-    result = sentiment_pipeline(feedback_text)[0]
+    result = analyze_feedback_batch([feedback_text])[0]
     label = result['label']   # POSITIVE or NEGATIVE
     score = result['score']   # Confidence score
     return label, round(score, 2)
 
+
 if __name__ == "__main__":
     feedback = "It was not good "
     sentiment, confidence = analyze_feedback(feedback)
     print(f"Sentiment: {sentiment}, Confidence: {confidence}")
+
+    # python feed.py [n_texts]: one call per text vs. length-sorted batches
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    samples = ["Loved the animation", "Too fast, need more examples for the harder integration problems",
+               "Clear and concise", "Hard to follow, the teacher skipped the derivation of the chain rule twice",
+               "It was not good "]
+    texts = [samples[i % len(samples)] * (1 + i % 3) for i in range(n)]
+
+    start = time.perf_counter()
+    single = [analyze_feedback(text) for text in texts]
+    single_s = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = analyze_feedback_batch(texts)
+    batch_s = time.perf_counter() - start
+
+    same = all(label == result['label'] for (label, _), result in zip(single, batched))
+    print(f"⏱️ {n} texts: one by one {n / single_s:.0f}/s, batched {n / batch_s:.0f}/s "
+          f"({single_s / batch_s:.1f}x), same labels: {same}")
@@ -0,0 +1,237 @@
+import os
+import sys
+import time
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+
+# Add the repository root to system path for the shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared.micro_batcher import MicroBatcher
+
+# Learning-data store: one SQLite file in WAL mode, indexed on user_id and topic.
+# Submissions are appended through a single writer thread that commits them in
+# batches (everything that arrives within `max_wait_ms` of the first one), so a
+# write costs one INSERT, not a rewrite of the dataset, and concurrent requests
+# or worker processes cannot overwrite each other's rows. Per-user reads are
+# answered from an in-memory UserIndex kept up to date from the same table.
+DEFAULT_DB_PATH = "edtech_learning.sqlite3"
+COLUMNS = ["user_id", "topic", "time_spent", "quiz_score", "preference", "feedback", "rating"]
+INSERT_SQL = f"INSERT INTO learning_data ({', '.join(COLUMNS)}, created) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})"
+
+
+def _row(record, now):
+    return [record[column] for column in COLUMNS] + [now]
+
+
+def _connect(db_path):
+    db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; safe with WAL
+    return db
+
+
+# === In-memory per-user aggregates ===
+# users:  user_id -> [rows, scored rows, quiz score sum, set of topics seen]
+# topics: topic -> rows, i.e. the global topic set
+# Built once from a full read of the table, then advanced with the rows whose
+# id is above `last_id`. Row ids grow in commit order (SQLite has one writer at a
+# time), so this also picks up rows written by other worker processes, and every
+# lookup costs the same whatever the size of the table.
+class UserIndex:
+    def __init__(self, db_path, chunksize=1_000_000):
+        self._lock = threading.Lock()
+        self._db = _connect(db_path)
+        self.users = {}
+        self.topics = {}
+        self.last_id = 0
+
+        start = time.perf_counter()
+        with self._lock:
+            self._db.execute("BEGIN")  # one snapshot for MAX(id) and the rows
+            try:
+                self.last_id = self._db.execute("SELECT COALESCE(MAX(id), 0) FROM learning_data").fetchone()[0]
+                # (user_id, topic) partial aggregates per chunk keep memory bounded
+                parts = [chunk.groupby(["user_id", "topic"], sort=False)["quiz_score"].agg(["size", "count", "sum"])
+                         for chunk in pd.read_sql_query(
+                             "SELECT user_id, topic, quiz_score FROM learning_data WHERE id <= ?",
+                             self._db, params=(self.last_id,), chunksize=chunksize)]
+            finally:
+                self._db.execute("COMMIT")
+        if parts:
+            self._load(pd.concat(parts).groupby(level=[0, 1], sort=True).sum())
+        self.build_seconds = time.perf_counter() - start
+
+    # Sorted (user_id, topic) aggregates -> one entry per user
+    def _load(self, pairs):
+        if pairs.empty:
+            return
+        user_ids = pairs.index.get_level_values(0).to_numpy()
+        pair_topics = pairs.index.get_level_values(1).to_numpy()
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(user_ids)) + 1])
+        ends = np.append(starts[1:], len(user_ids))
+        totals = [np.add.reduceat(pairs[column].to_numpy(), starts).tolist() for column in ("size", "count", "sum")]
+        for user_id, rows, scored, score_sum, start, end in zip(user_ids[starts].tolist(), *totals, starts, ends):
+            self.users[user_id] = [rows, scored, score_sum, set(pair_topics[start:end].tolist())]
+        self.topics = pairs["size"].groupby(level=1).sum().to_dict()
+
+    def _apply(self, rows):
+        users, topics = self.users, self.topics
+        for user_id, topic, count, scored, score_sum in rows:
+            user = users.get(user_id)
+            if user is None:
+                user = users[user_id] = [0, 0, 0, set()]
+            user[0] += count
+            user[1] += scored
+            user[2] += score_sum
+            user[3].add(topic)
+            topics[topic] = topics.get(topic, 0) + count
+
+    # Applies rows committed since the last call (by this process or any other)
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    # Caller holds self._lock
+    def _sync(self):
+        rows = self._db.execute(
+            "SELECT id, user_id, topic, quiz_score FROM learning_data WHERE id > ? ORDER BY id", (self.last_id,)
+        ).fetchall()
+        if rows:
+            self._apply((user_id, topic, 1, score is not None, score or 0) for _, user_id, topic, score in rows)
+            self.last_id = rows[-1][0]
+
+    # Lookups sync and read under the same lock, since the writer thread
+    # updates these dicts and sets in sync()
+    def user_topics(self, user_id):
+        with self._lock:
+            self._sync()
+            user = self.users.get(user_id)
+            return list(user[3]) if user else []
+
+    def all_topics(self):
+        with self._lock:
+            self._sync()
+            return list(self.topics)
+
+    # (mean quiz score, number of rows) for one user; NaN mean like pandas when
+    # no row has a score, (nan, 0) for an unknown user
+    def user_score(self, user_id):
+        with self._lock:
+            self._sync()
+            user = self.users.get(user_id)
+            if user is None:
+                return float("nan"), 0
+            rows, scored, score_sum = user[0], user[1], user[2]
+        return (score_sum / scored if scored else float("nan")), rows
+
+
+class LearningStore:
+    def __init__(self, db_path=DEFAULT_DB_PATH, seed_csv=None, max_batch_size=512, max_wait_ms=5.0):
+        self.db_path = db_path
+
+        self._lock = threading.Lock()  # guards the reader connection
+        self._db = _connect(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS learning_data ("
+            "id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, topic TEXT NOT NULL, "
+            "time_spent INTEGER, quiz_score INTEGER, preference TEXT, feedback TEXT, rating INTEGER, "
+            "created REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_learning_user_id ON learning_data (user_id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_learning_topic ON learning_data (topic)")
+        self._db.commit()
+        if seed_csv and os.path.exists(seed_csv):
+            self._seed(seed_csv)
+
+        self.index = UserIndex(db_path)
+        self._writer_db = None
+        self._writer = MicroBatcher(self._write, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                                    setup_fn=self._open_writer, flush_on_stop=True, name="learning-store-writer")
+
+    # === One-time import of the old CSV dataset into an empty store ===
+    # BEGIN IMMEDIATE takes the write lock before the emptiness check, so when
+    # several workers start together only one of them imports
+    def _seed(self, csv_path):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if self._db.execute("SELECT COUNT(*) FROM learning_data").fetchone()[0] == 0:
+                    now = time.time()
+                    rows = pd.read_csv(csv_path)[COLUMNS].to_dict(orient="records")
+                    self._db.executemany(INSERT_SQL, [_row(record, now) for record in rows])
+                    print(f"📥 Imported {len(rows)} rows from {csv_path} into {self.db_path}")
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+
+    # Synchronous bulk insert in one transaction; returns the new row ids
+    def insert_many(self, records):
+        now = time.time()
+        with self._lock, self._db:
+            return [self._db.execute(INSERT_SQL, _row(record, now)).lastrowid for record in records]
+
+    # === Batched writer (shared/micro_batcher.py) ===
+    def start(self):
+        self._writer.start()
+
+    # Writes whatever is still queued before returning
+    def stop(self):
+        self._writer.stop()
+        if self._writer_db is not None:
+            self._writer_db.close()
+            self._writer_db = None
+
+    # Resolves with the new row id once the row is committed. The writer
+    # starts here if it is not running (no startup hook, or the store is used
+    # on its own).
+    async def submit(self, record):
+        return await self._writer.submit(record)
+
+    # The writer has its own connection, so reads never wait for a commit
+    def _open_writer(self):
+        if self._writer_db is None:
+            self._writer_db = _connect(self.db_path)
+
+    # One transaction per batch; returns the new row ids
+    def _write(self, records):
+        now = time.time()
+        with self._writer_db:
+            ids = [self._writer_db.execute(INSERT_SQL, _row(record, now)).lastrowid for record in records]
+        try:
+            self.index.sync()
+        except sqlite3.Error as e:  # the rows are committed; lookups sync again on their own
+            print(f"⚠️ User index sync failed: {e}", flush=True)
+        return ids
+
+    def metrics(self):
+        writer = self._writer.metrics()
+        return {
+            "queue_depth": writer["queue_depth"],
+            "batches": writer["batches"],
+            "rows_written": writer["items"],
+            "avg_batch_size": writer["avg_batch_size"],
+            "indexed_users": len(self.index.users),
+            "index_build_seconds": round(self.index.build_seconds, 3),
+        }
+
+    # === Reads ===
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM learning_data").fetchone()[0]
+
+    # Per-user lookups come from the in-memory index, not from the table
+    def user_topics(self, user_id):
+        return self.index.user_topics(user_id)
+
+    def topics(self):
+        return self.index.all_topics()
+
+    def user_score(self, user_id):
+        return self.index.user_score(user_id)
+
+    def to_dataframe(self):
+        with self._lock:
+            return pd.read_sql_query(f"SELECT {', '.join(COLUMNS)} FROM learning_data ORDER BY id", self._db)
@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+# Load test for POST /submit_data against a running API:
+#   uvicorn api:app --workers 4
+#   python load_test_submit.py [url] [seconds] [concurrency]
+# Reports sustained submissions per second and latency percentiles, then checks
+# (via /store_metrics) that every acknowledged submission was stored.
+# With "direct" as the url, the store is driven in-process (no HTTP) on a temp
+# database, which shows what the batched writer itself sustains.
+URL = sys.argv[1] if len(sys.argv) > 1 else "http://127.0.0.1:8000"
+SECONDS = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+CONCURRENCY = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+
+TOPICS = ["Algebra", "Geometry", "Calculus", "Trigonometry", "Statistics", "Derivatives", "Probability"]
+PREFERENCES = ["Visual", "Text", "Audio", "Interactive"]
+FEEDBACK = ["Loved the animation", "Too fast, need more examples", "Clear and concise", "Hard to follow"]
+
+
+def random_submission(rng):
+    return {
+        "user_id": rng.randint(100, 10_000),
+        "topic": rng.choice(TOPICS),
+        "time_spent": rng.randint(5, 120),
+        "quiz_score": rng.randint(0, 100),
+        "preference": rng.choice(PREFERENCES),
+        "feedback": rng.choice(FEEDBACK),
+        "rating": rng.randint(1, 5),
+    }
+
+
+def stored_rows():
+    return requests.get(f"{URL}/store_metrics", timeout=10).json()["rows"]
+
+
+# === In-process run: CONCURRENCY asyncio clients awaiting LearningStore.submit ===
+async def direct_run(store, deadline, latencies):
+    async def client(worker_id):
+        rng = random.Random(worker_id)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await store.submit(random_submission(rng))
+            latencies.append(time.perf_counter() - start)
+    await asyncio.gather(*(client(worker_id) for worker_id in range(CONCURRENCY)))
+
+
+def client(worker_id, deadline, latencies, errors, lock):
+    rng = random.Random(worker_id)
+    session = requests.Session()
+    local, failed = [], 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = session.post(f"{URL}/submit_data", json=random_submission(rng), timeout=30)
+            response.raise_for_status()
+            local.append(time.perf_counter() - start)
+        except requests.RequestException:
+            failed += 1
+    with lock:
+        latencies.extend(local)
+        errors.append(failed)
+
+
+if __name__ == "__main__":
+    latencies, errors, lock = [], [], threading.Lock()
+    if URL == "direct":
+        from learning_store import LearningStore
+        store = LearningStore(os.path.join(tempfile.mkdtemp(), "load_test.sqlite3"))
+        store.start()
+        stored_rows = store.count
+
+    before = stored_rows()
+    start = time.perf_counter()
+    deadline = start + SECONDS
+    if URL == "direct":
+        asyncio.run(direct_run(store, deadline, latencies))
+        errors.append(0)
+    else:
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+            for worker_id in range(CONCURRENCY):
+                pool.submit(client, worker_id, deadline, latencies, errors, lock)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float("nan")
+    print(f"🚀 {len(latencies)} submissions in {elapsed:.1f}s with {CONCURRENCY} clients: "
+          f"{len(latencies) / elapsed:.0f}/s, {sum(errors)} errors")
+    print(f"⏱️ latency p50 {pct(0.5):.1f} ms, p95 {pct(0.95):.1f} ms, p99 {pct(0.99):.1f} ms")
+
+    stored = stored_rows() - before
+    if URL == "direct":
+        print(f"📦 Writer: {store.metrics()}")
+        store.stop()
+    status = "✅" if stored == len(latencies) else "❌"
+    print(f"{status} {stored} new rows stored for {len(latencies)} acknowledged submissions")
@@ -0,0 +1,431 @@
+import os
+import csv
+import json
+import time
+import numpy as np
+import pandas as pd
+from collections import Counter
+from scipy.sparse import csc_matrix, csr_matrix, hstack, vstack
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, TfidfVectorizer
+from ann_index import IVFIndex
+
+# Index layout (one directory):
+#   meta.json          version, source file stamp, counts and drift statistics
+#   vocabulary.json    term -> column
+#   idf.npy            IDF weights the matrix was built with
+#   doc_freq.npy       live document frequencies (fitted + appended rows)
+#   data/indices/indptr.npy        base CSR matrix, L2-normalized TF-IDF rows (memmapped)
+#   postings_data/indices/indptr.npy  the same matrix as CSC, i.e. term -> resources (memmapped)
+#   delta_data/indices/indptr.npy  rows appended since the last rebuild
+#   resources.csv      resource metadata, one line per matrix row (append-only)
+#   ann_*.npy          optional approximate-search index over the base rows (see ann_index.py)
+INDEX_VERSION = 2
+RESOURCE_COLUMNS = ["subject", "title", "url", "difficulty", "type", "description"]
+DRIFT_THRESHOLD = float(os.getenv("RESOURCE_INDEX_DRIFT", "0.2"))
+# ANN is opt-in: RESOURCE_INDEX_ANN=1 builds an ANN index with the resource index
+# and lets mode="auto" search it. There is no catalog-size switch: in
+# bench_ann.py exact search over the postings beat ANN at every size measured
+# (4-25x more qps at 50k and 200k resources, where ANN recall@10 is 0.81-0.99).
+USE_ANN = os.getenv("RESOURCE_INDEX_ANN", "0") == "1"
+# ANN candidates re-scored exactly per query: max(top_k * ANN_REFINE, 1000)
+ANN_REFINE = int(os.getenv("ANN_REFINE", "100"))
+
+
+# Text that gets indexed, for a whole DataFrame at once
+def resource_texts(resources):
+    return (resources["title"].astype(str) + " " + resources["description"].astype(str)
+            + " " + resources["subject"].astype(str))
+
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {"path": os.path.abspath(csv_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def _csr(data, indices, indptr, n_terms):
+    return csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, n_terms), copy=False)
+
+
+def _csc(data, indices, indptr, n_rows):
+    return csc_matrix((data, indices, indptr), shape=(n_rows, len(indptr) - 1), copy=False)
+
+
+def _to_postings(matrix):
+    postings = matrix.tocsc()
+    index_dtype = np.int32 if postings.nnz < 2 ** 31 else np.int64
+    postings.indices = postings.indices.astype(index_dtype)
+    postings.indptr = postings.indptr.astype(index_dtype)
+    return postings
+
+
+def _as_values(value):
+    if value is None:
+        return None
+    values = [value] if isinstance(value, str) else value
+    return tuple(sorted(str(v).strip().lower() for v in values))
+
+
+# === Persistent TF-IDF index over learning resources ===
+# The vocabulary and IDF are frozen at build time. add() vectorizes new resources
+# against them (no refit) and tracks how far the catalog has drifted from the
+# fitted statistics; once drift passes `drift_threshold` the index is rebuilt.
+class ResourceIndex:
+    def __init__(self, path, vocabulary, idf, doc_freq, base, resources, meta,
+                 drift_threshold=DRIFT_THRESHOLD, postings=None):
+        self.path = path
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.doc_freq = doc_freq
+        self.base = base
+        self.postings = postings if postings is not None else _to_postings(base)
+        self.ann = None
+        self.delta = _csr(np.zeros(0, np.float32), np.zeros(0, np.int32), np.zeros(1, np.int32), len(idf))
+        self.resources = resources
+        self.meta = meta
+        self.drift_threshold = drift_threshold
+        self._analyzer = TfidfVectorizer(stop_words="english").build_analyzer()
+        self._columns = None  # column -> numpy array, for building result records
+        self._masks = {}      # (column, values) -> boolean row mask for filters
+
+    # === Build from a resources CSV (full fit) ===
+    @classmethod
+    def build(cls, csv_path, path, drift_threshold=DRIFT_THRESHOLD):
+        start = time.perf_counter()
+        resources = pd.read_csv(csv_path)[RESOURCE_COLUMNS].fillna("")
+        index = cls.from_frame(resources, path, drift_threshold)
+        index.meta["source"] = _source_stamp(csv_path)
+        index.save()
+        print(f"📚 Built resource index: {len(resources)} resources, {len(index.idf)} terms "
+              f"{'+ ANN ' if index.ann is not None else ''}in {time.perf_counter() - start:.2f}s")
+        return index
+
+    # Full fit over a DataFrame with RESOURCE_COLUMNS; nothing is written to disk.
+    # ann=None builds the ANN index only when RESOURCE_INDEX_ANN=1.
+    @classmethod
+    def from_frame(cls, resources, path=None, drift_threshold=DRIFT_THRESHOLD, ann=None):
+        # Count + TfidfTransformer is what TfidfVectorizer does internally; the
+        # counts are kept long enough to know how many tokens the fit saw
+        counter = CountVectorizer(stop_words="english")
+        counts = counter.fit_transform(resource_texts(resources))
+        transformer = TfidfTransformer()
+        matrix = transformer.fit_transform(counts).astype(np.float32).tocsr()
+        # int32 indices keep scipy from copying the memmapped arrays on load
+        index_dtype = np.int32 if matrix.nnz < 2 ** 31 else np.int64
+        matrix.indices = matrix.indices.astype(index_dtype)
+        matrix.indptr = matrix.indptr.astype(index_dtype)
+
+        vocabulary = {term: int(col) for term, col in counter.vocabulary_.items()}
+        idf = transformer.idf_.astype(np.float32)
+        doc_freq = np.bincount(matrix.indices, minlength=len(idf)).astype(np.int64)
+        meta = {"version": INDEX_VERSION, "fitted_rows": matrix.shape[0], "fitted_tokens": int(counts.sum()),
+                "appended_rows": 0, "appended_tokens": 0, "oov_tokens": 0}
+        index = cls(path, vocabulary, idf, doc_freq, matrix, resources.reset_index(drop=True), meta,
+                    drift_threshold)
+        if ann or (ann is None and USE_ANN):
+            index.build_ann()
+        return index
+
+    # === Load a saved index; the matrix arrays are memory-mapped ===
+    @classmethod
+    def load(cls, path, mmap=True, drift_threshold=DRIFT_THRESHOLD):
+        mode = "r" if mmap else None
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            meta = json.load(f)
+        with open(os.path.join(path, "vocabulary.json"), "r") as f:
+            vocabulary = json.load(f)
+        idf = np.load(os.path.join(path, "idf.npy"))
+        doc_freq = np.load(os.path.join(path, "doc_freq.npy"))
+        base = _csr(*(np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+                      for name in ("data", "indices", "indptr")), len(idf))
+        postings = _csc(*(np.load(os.path.join(path, f"postings_{name}.npy"), mmap_mode=mode)
+                          for name in ("data", "indices", "indptr")), base.shape[0])
+        resources = pd.read_csv(os.path.join(path, "resources.csv"), keep_default_na=False)
+
+        index = cls(path, vocabulary, idf, doc_freq, base, resources, meta, drift_threshold, postings)
+        if os.path.exists(os.path.join(path, "delta_indptr.npy")):
+            index.delta = _csr(*(np.load(os.path.join(path, f"delta_{name}.npy"))
+                                 for name in ("data", "indices", "indptr")), len(idf))
+        if IVFIndex.exists(path):
+            index.ann = IVFIndex.load(path, mmap=mmap)
+        return index
+
+    # Load the saved index if it was built from this CSV as it is now, else rebuild.
+    # Resources added with add() live in the index only; a rebuild from an edited
+    # CSV starts over from that file.
+    @classmethod
+    def open(cls, csv_path, path, drift_threshold=DRIFT_THRESHOLD):
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            if meta.get("version") == INDEX_VERSION and meta.get("source") == _source_stamp(csv_path):
+                return cls.load(path, drift_threshold=drift_threshold)
+            print("🔄 Resource index is stale, rebuilding...")
+        return cls.build(csv_path, path, drift_threshold)
+
+    # === Persistence ===
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        # Arrays are written to temp files first: the live ones may be memmapped
+        arrays = {"idf": self.idf}
+        for prefix, matrix in (("", self.base), ("postings_", self.postings)):
+            for name in ("data", "indices", "indptr"):
+                arrays[prefix + name] = getattr(matrix, name)
+        for name, array in arrays.items():
+            np.save(os.path.join(self.path, f"{name}.tmp.npy"), array)
+        for name in arrays:
+            os.replace(os.path.join(self.path, f"{name}.tmp.npy"), os.path.join(self.path, f"{name}.npy"))
+        with open(os.path.join(self.path, "vocabulary.json"), "w") as f:
+            json.dump(self.vocabulary, f)
+        if self.ann is not None:
+            self.ann.save(self.path)
+        else:
+            IVFIndex.remove(self.path)
+        self.resources.to_csv(os.path.join(self.path, "resources.csv"), index=False)
+        self._save_delta()
+
+    def _save_delta(self):
+        for name in ("data", "indices", "indptr"):
+            np.save(os.path.join(self.path, f"delta_{name}.npy"), getattr(self.delta, name))
+        np.save(os.path.join(self.path, "doc_freq.npy"), self.doc_freq)
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(self.meta, f)
+
+    # === Vectorize text with the frozen vocabulary and IDF ===
+    # Same output as the fitted TfidfVectorizer.transform: raw counts x IDF,
+    # L2-normalized. Returns the matrix plus in-vocabulary and out-of-vocabulary token counts.
+    def transform(self, texts):
+        data, indices, indptr = [], [], [0]
+        known = oov = 0
+        for text in texts:
+            counts = Counter()
+            for token in self._analyzer(text):
+                col = self.vocabulary.get(token)
+                if col is None:
+                    oov += 1
+                else:
+                    counts[col] += 1
+                    known += 1
+            cols = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+            weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts)) * self.idf[cols]
+            norm = np.linalg.norm(weights)
+            data.append(weights / norm if norm else weights)
+            indices.append(cols)
+            indptr.append(indptr[-1] + len(cols))
+        matrix = _csr(np.concatenate(data) if data else np.zeros(0, np.float32),
+                      np.concatenate(indices) if indices else np.zeros(0, np.int32),
+                      np.array(indptr, dtype=np.int64), len(self.idf))
+        return matrix, known, oov
+
+    @property
+    def matrix(self):
+        return self.base if self.delta.shape[0] == 0 else vstack([self.base, self.delta], format="csr")
+
+    def __len__(self):
+        return self.base.shape[0] + self.delta.shape[0]
+
+    # === Drift since the last fit ===
+    # oov_rate:  share of all catalog tokens (fitted + appended) that the frozen
+    #            vocabulary cannot represent
+    # idf_shift: relative L1 change between the fitted IDF and the IDF the
+    #            current document frequencies would give
+    def drift(self):
+        total = self.meta["fitted_tokens"] + self.meta["appended_tokens"] + self.meta["oov_tokens"]
+        oov_rate = self.meta["oov_tokens"] / total if total else 0.0
+        n_docs = len(self)
+        live_idf = np.log((1 + n_docs) / (1 + self.doc_freq)) + 1
+        idf_shift = float(np.abs(live_idf - self.idf).sum() / self.idf.sum())
+        return {"oov_rate": oov_rate, "idf_shift": idf_shift, "drift": max(oov_rate, idf_shift)}
+
+    # === Append resources without refitting ===
+    # `resources` is a DataFrame or a list of dicts with RESOURCE_COLUMNS.
+    # Returns True if the append pushed drift past the threshold and triggered a rebuild.
+    def add(self, resources):
+        resources = pd.DataFrame(resources).reindex(columns=RESOURCE_COLUMNS).fillna("")
+        if resources.empty:
+            return False
+        rows, known, oov = self.transform(resource_texts(resources))
+
+        self.delta = vstack([self.delta, rows], format="csr") if self.delta.shape[0] else rows
+        self.doc_freq += np.bincount(rows.indices, minlength=len(self.idf))
+        self.resources = pd.concat([self.resources, resources], ignore_index=True)
+        self._columns = None
+        self._masks = {}
+        self.meta["appended_rows"] += len(resources)
+        self.meta["appended_tokens"] += known
+        self.meta["oov_tokens"] += oov
+
+        if self.drift()["drift"] > self.drift_threshold:
+            print(f"🔁 Drift {self.drift()['drift']:.2f} > {self.drift_threshold}, rebuilding resource index...")
+            self.rebuild()
+            return True
+
+        # Only the small pieces are rewritten; the base matrix files stay untouched
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            resources.to_csv(os.path.join(self.path, "resources.csv"), mode="a", header=False, index=False,
+                             quoting=csv.QUOTE_MINIMAL)
+            self._save_delta()
+        return False
+
+    # === Full refit over every resource, fitted and appended ===
+    def rebuild(self):
+        fresh = self.from_frame(self.resources, self.path, self.drift_threshold,
+                                ann=True if self.ann is not None else None)
+        fresh.meta["source"] = self.meta.get("source")
+        self.__dict__.update(fresh.__dict__)
+        if self.path:
+            self.save()
+
+    # === Filters: boolean row masks, built once per (column, values) ===
+    def mask(self, column, values):
+        key = (column, values)
+        if key not in self._masks:
+            lowered = self.resources[column].astype(str).str.strip().str.lower().to_numpy()
+            self._masks[key] = np.isin(lowered, values)
+        return self._masks[key]
+
+    def filter_mask(self, subject=None, difficulty=None):
+        mask = None
+        for column, value in (("subject", subject), ("difficulty", difficulty)):
+            values = _as_values(value)
+            if values is not None:
+                mask = self.mask(column, values) if mask is None else mask & self.mask(column, values)
+        return mask
+
+    # === Approximate search index over the base rows ===
+    # Rows appended later are not in it; searches score them exactly instead.
+    def build_ann(self, **kwargs):
+        start = time.perf_counter()
+        self.ann = IVFIndex.fit(self.base, **kwargs)
+        print(f"🧭 Built ANN index: {len(self.ann.centroids)} lists x {self.ann.components.shape[0]} dims "
+              f"in {time.perf_counter() - start:.1f}s")
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            self.ann.save(self.path)
+
+    def use_ann(self, mode="auto"):
+        if mode == "exact" or self.ann is None:
+            if mode == "ann":
+                raise ValueError("This resource index has no ANN index; call build_ann() first.")
+            return False
+        return mode == "ann" or USE_ANN
+
+    # Exact: one sparse product scores every query against every resource,
+    # touching only the postings of the query terms
+    def _exact_candidates(self, query_matrix):
+        scores = query_matrix @ self.postings.T
+        if self.delta.shape[0]:
+            scores = hstack([scores, query_matrix @ self.delta.T], format="csr")
+        scores = scores.tocsr()
+        for row in range(query_matrix.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            yield scores.indices[start:end], scores.data[start:end]
+
+    # ANN: the IVF index proposes candidates, which are re-scored with the exact
+    # TF-IDF cosine (one row-wise product for the whole batch); appended rows are
+    # always scored exactly
+    def _ann_candidates(self, query_matrix, top_k, mask, nprobe=None):
+        n_base = self.base.shape[0]
+        candidates = self.ann.search(query_matrix, max(top_k * ANN_REFINE, 1000), nprobe=nprobe,
+                                     mask=None if mask is None else mask[:n_base])
+        counts = np.array([len(ids) for ids in candidates])
+        all_ids = np.concatenate(candidates) if candidates else np.zeros(0, dtype=np.int64)
+        owners = np.repeat(np.arange(len(candidates)), counts)
+        exact = np.asarray(self.base[all_ids].multiply(query_matrix[owners]).sum(axis=1)).ravel()
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+
+        delta_scores = (query_matrix @ self.delta.T).tocsr() if self.delta.shape[0] else None
+        for row in range(len(candidates)):
+            ids, values = all_ids[bounds[row]:bounds[row + 1]], exact[bounds[row]:bounds[row + 1]]
+            if delta_scores is not None:
+                start, end = delta_scores.indptr[row], delta_scores.indptr[row + 1]
+                ids = np.concatenate([ids, delta_scores.indices[start:end] + n_base])
+                values = np.concatenate([values, delta_scores.data[start:end]])
+            keep = values > 0
+            yield ids[keep], values[keep]
+
+    # === Batched top-k search ===
+    # Per query, argpartition picks the top_k candidates among the non-zero
+    # scores; ties are broken by row order. `subject` / `difficulty` take a value
+    # or a list of values (case-insensitive). mode is "exact", "ann" or "auto"
+    # (ANN only with RESOURCE_INDEX_ANN=1 and an ANN index, exact otherwise).
+    # Returns one (indices, scores) pair per query.
+    def search_many(self, queries, top_k=5, subject=None, difficulty=None, mode="auto", nprobe=None):
+        query_matrix, _, _ = self.transform(queries)
+        mask = self.filter_mask(subject, difficulty)
+        allowed = np.flatnonzero(mask) if mask is not None else None
+        if self.use_ann(mode):
+            candidates = self._ann_candidates(query_matrix, top_k, mask, nprobe)
+        else:
+            candidates = self._exact_candidates(query_matrix)
+
+        results = []
+        for rows, values in candidates:
+            if mask is not None:
+                keep = mask[rows]
+                rows, values = rows[keep], values[keep]
+            if len(rows) > top_k:
+                # Everything tied with the k-th best score stays, so ties resolve by row
+                kth = values[np.argpartition(-values, top_k - 1)[top_k - 1]]
+                keep = values >= kth
+                rows, values = rows[keep], values[keep]
+            order = np.lexsort((rows, -values))[:top_k]
+            rows, values = rows[order], values[order]
+
+            # Like the full sort did, pad with zero-score resources in row order
+            if len(rows) < top_k:
+                head = allowed[:top_k + len(rows)] if allowed is not None else np.arange(min(len(self), top_k + len(rows)))
+                padding = head[~np.isin(head, rows)][:top_k - len(rows)]
+                rows = np.concatenate([rows, padding])
+                values = np.concatenate([values, np.zeros(len(padding), dtype=values.dtype)])
+            results.append((rows, values))
+        return results
+
+    def search(self, query, top_n=5, subject=None, difficulty=None, mode="auto"):
+        return self.search_many([query], top_k=top_n, subject=subject, difficulty=difficulty, mode=mode)[0]
+
+    # Result rows as plain dicts, read from per-column arrays (no DataFrame slicing)
+    def records(self, rows, fields, scores=None):
+        if self._columns is None:
+            self._columns = {column: self.resources[column].to_numpy() for column in self.resources.columns}
+        records = [{field: self._columns[field][row] for field in fields} for row in rows]
+        if scores is not None:
+            for record, score in zip(records, scores):
+                record["score"] = float(score)
+        return records
+
+if __name__ == "__main__":
+    import tempfile
+
+    # Demo: build, reload memmapped, append without refit, then force a rebuild
+    csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "learning_resources_large.csv")
+    index_dir = os.path.join(tempfile.mkdtemp(), "resource_index")
+
+    index = ResourceIndex.build(csv_path, index_dir)
+    start = time.perf_counter()
+    index = ResourceIndex.load(index_dir)
+    print(f"⚡ Loaded in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"(matrix is file-backed: {not index.base.data.flags.owndata})")
+
+    # The loaded index ranks exactly like a freshly fitted TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+    texts = resource_texts(pd.read_csv(csv_path))
+    vectorizer = TfidfVectorizer(stop_words="english")
+    reference = cosine_similarity(vectorizer.fit(texts).transform(["algebra equations"]),
+                                  vectorizer.transform(texts)).ravel()
+    top, scores = index.search("algebra equations", top_n=5)
+    assert np.allclose(scores, np.sort(reference)[::-1][:5], atol=1e-5)
+
+    rebuilt = index.add([{"subject": "Math", "title": "Math Topic Review", "url": "https://example.com/math_review",
+                          "difficulty": "easy", "type": "video", "description": "A resource covering every math topic"}])
+    print(f"➕ Appended 1 resource (rebuilt: {rebuilt}), drift {index.drift()}")
+    top, scores = index.search("math review resource", top_n=3)
+    print(f"🔍 Top after append: {index.resources['title'].iloc[top].tolist()}")
+    assert len(ResourceIndex.load(index_dir)) == len(index)  # appended rows survive a reload
+
+    rebuilt = index.add([{"subject": "Robotics", "title": f"Servo Kinematics {i}", "url": f"https://example.com/robotics_{i}",
+                          "difficulty": "hard", "type": "article", "description": "Actuators, servos and inverse kinematics"}
+                         for i in range(60)])
+    print(f"➕ Appended 60 off-vocabulary resources (rebuilt: {rebuilt}), {len(index)} rows, {len(index.idf)} terms")
+    print(f"🔍 'servo kinematics' -> {index.resources['title'].iloc[index.search('servo kinematics', 2)[0]].tolist()}")
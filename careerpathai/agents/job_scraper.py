@@ -1,36 +1,239 @@
+import asyncio
+import copy
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urljoin, urlsplit
+
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
-def scrape_jobs(skill):
-    url = f"https://www.naukri.com/{skill}-jobs"
-    headers = {
-        "User-Agent": "Mozilla/5.0"
-    }
+BASE_URL = "https://www.naukri.com"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0"
+}
+PAGES = 2                 # result pages fetched per query
+CACHE_TTL = 15 * 60       # seconds a parsed query result is reused
+REQUESTS_PER_SECOND = 2   # per host
+MAX_CONNECTIONS = 4       # per host, also the number of fetches in flight
 
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        job_cards = soup.find_all("article", class_="jobTuple bgWhite br4 mb-8")
-
-        jobs = []
-        for card in job_cards[:5]:  # Limit to 5 jobs
-            title_tag = card.find("a", class_="title")
-            company_tag = card.find("a", class_="subTitle")
-            location_tag = card.find("li", class_="location")
-
-            title = title_tag.text.strip() if title_tag else "N/A"
-            company = company_tag.text.strip() if company_tag else "N/A"
-            location = location_tag.text.strip() if location_tag else "N/A"
-            job_url = title_tag["href"] if title_tag and "href" in title_tag.attrs else "#"
-
-            jobs.append({
-                "title": title,
-                "company": company,
-                "location": location,
-                "url": job_url
-            })
 
-        return jobs if jobs else "❌ No jobs found (try a different keyword)."
+# === Parser: one results page -> list of job dicts ===
+# Handles the older `article.jobTuple` cards and the current
+# `div.srp-jobtuple-wrapper` cards.
+def parse_jobs(html, base_url=BASE_URL):
+    soup = BeautifulSoup(html, "html.parser")
+    jobs = []
+    for card in soup.select("article.jobTuple, div.srp-jobtuple-wrapper"):
+        title_tag = card.select_one("a.title")
+        company_tag = card.select_one("a.subTitle, a.comp-name")
+        location_tag = card.select_one("li.location, span.locWdth")
+        skill_tags = card.select("ul.tags li, ul.tags-gt li")
+        description_tag = card.select_one("div.job-description, span.job-desc")
+
+        title = title_tag.text.strip() if title_tag else "N/A"
+        company = company_tag.text.strip() if company_tag else "N/A"
+        location = location_tag.text.strip() if location_tag else "N/A"
+        job_url = urljoin(base_url, title_tag["href"]) if title_tag and "href" in title_tag.attrs else "#"
+
+        jobs.append({
+            "title": title,
+            "company": company,
+            "location": location,
+            "url": job_url,
+            "skills": [tag.text.strip() for tag in skill_tags],
+            "description": description_tag.text.strip() if description_tag else "",
+        })
+    return jobs
+
+
+# === Per-host rate limiter ===
+# Each request reserves the next free time slot for its host under a plain
+# lock and then sleeps until it; nothing is tied to one event loop, so the
+# limiter can be shared by every asyncio.run() call in the process.
+class HostRateLimiter:
+    def __init__(self, requests_per_second=REQUESTS_PER_SECOND):
+        self.interval = 1.0 / requests_per_second
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, host):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.interval
+            return slot - now
+
+    async def wait(self, host):
+        delay = self.reserve(host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# === TTL cache: query -> parsed jobs, least recently used evicted first ===
+# Values are copied in and out, so callers can sort or annotate their jobs
+# without changing what later callers get. Every put gets a new version
+# (unique across caches), which names the stored value itself: anything built
+# from it, like a skill index, can be keyed on the version instead of the jobs.
+_versions = itertools.count(1)
+
+
+class TTLCache:
+    def __init__(self, ttl=CACHE_TTL, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # (version, copy of value), or None if missing or expired
+    def get_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, version, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return version, copy.deepcopy(value)
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[1] if entry is not None else None
+
+    def put(self, key, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            version = next(_versions)
+            self._entries[key] = (time.monotonic() + self.ttl, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return version
+
+
+# === Concurrent scraper ===
+# Pages are fetched with asyncio.to_thread over one pooled requests.Session;
+# the pool blocks at MAX_CONNECTIONS per host, and the rate limiter spaces
+# requests to the same host.
+class JobScraper:
+    def __init__(self, base_url=BASE_URL, pages=PAGES, ttl=CACHE_TTL,
+                 requests_per_second=REQUESTS_PER_SECOND, max_connections=MAX_CONNECTIONS, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.pages = pages
+        self.timeout = timeout
+        self.cache = TTLCache(ttl)
+        self.limiter = HostRateLimiter(requests_per_second)
+
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections, pool_block=True)
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def page_url(self, query, page):
+        return f"{self.base_url}/{query}-jobs" + (f"-{page}" if page > 1 else "")
 
+    # `missing_ok`: a 404 past the first page just means there are no more results
+    async def fetch(self, url, missing_ok=False):
+        await self.limiter.wait(urlsplit(url).netloc)
+        response = await asyncio.to_thread(self.session.get, url, timeout=self.timeout)
+        if missing_ok and response.status_code == 404:
+            return ""
+        response.raise_for_status()
+        return response.text
+
+    async def search(self, query, pages=None):
+        jobs, _ = await self.search_versioned(query, pages)
+        return jobs
+
+    # All pages of one query, fetched together; duplicates across pages are dropped.
+    # -> (jobs, version of the cache entry holding them, or None if not cached)
+    async def search_versioned(self, query, pages=None):
+        query = query.lower().strip().replace(" ", "-")
+        pages = pages or self.pages
+        key = (query, pages)
+        cached = self.cache.get_entry(key)
+        if cached is not None:
+            version, jobs = cached
+            return jobs, version
+
+        fetches = [self.fetch(self.page_url(query, page), missing_ok=page > 1) for page in range(1, pages + 1)]
+        htmls = await asyncio.gather(*fetches, return_exceptions=True)
+        if isinstance(htmls[0], Exception):
+            raise htmls[0]
+        errors = [html for html in htmls if isinstance(html, Exception)]
+
+        jobs, seen = [], set()
+        for html in htmls:
+            if isinstance(html, Exception):
+                continue
+            for job in parse_jobs(html, self.base_url):
+                key_url = job["url"] if job["url"] != "#" else (job["title"], job["company"])
+                if key_url not in seen:
+                    seen.add(key_url)
+                    jobs.append(job)
+
+        # Only fully successful fetches are cached, so a flaky page is retried next time
+        version = self.cache.put(key, jobs) if not errors else None
+        return jobs, version
+
+    # Several queries at once -> ({query: jobs list or error message}, version);
+    # version is the tuple of cache-entry versions, None unless every query was cached
+    async def search_many(self, queries, pages=None):
+        queries = list(dict.fromkeys(queries))
+        results = await asyncio.gather(*(self.search_versioned(q, pages) for q in queries), return_exceptions=True)
+        jobs, versions = {}, []
+        for query, result in zip(queries, results):
+            if isinstance(result, Exception):
+                jobs[query] = f"❌ Job scraping failed: {str(result)}"
+                versions.append(None)
+            else:
+                jobs[query], version = result
+                versions.append(version)
+        return jobs, (tuple(versions) if None not in versions else None)
+
+
+_default_scraper = None
+_scraper_lock = threading.Lock()
+
+
+# One scraper per process, so every session shares its cache and rate limiter
+def get_scraper():
+    global _default_scraper
+    with _scraper_lock:
+        if _default_scraper is None:
+            _default_scraper = JobScraper()
+    return _default_scraper
+
+
+# Synchronous entry point: list of jobs, or an error message
+def scrape_jobs(skill, pages=None, scraper=None):
+    scraper = scraper or get_scraper()
+    try:
+        jobs = asyncio.run(scraper.search(skill, pages))
+        return jobs if jobs else "❌ No jobs found (try a different keyword)."
     except Exception as e:
         return f"❌ Job scraping failed: {str(e)}"
+
+
+# Used by the dashboard: several queries scraped together ->
+# ({query: list of jobs or error message}, version as in search_many)
+def scrape_many(skills, pages=None, scraper=None):
+    scraper = scraper or get_scraper()
+    results, version = asyncio.run(scraper.search_many(skills, pages))
+    return {query: jobs if jobs else "❌ No jobs found (try a different keyword)." for query, jobs in results.items()}, version
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python agents/job_scraper.py "data scientist, python" (live site; tests use fixtures/)
+    queries = [q.strip() for q in (sys.argv[1] if len(sys.argv) > 1 else "python").split(",") if q.strip()]
+    start = time.perf_counter()
+    for query, jobs in scrape_many(queries)[0].items():
+        print(f"🔎 {query}: " + (f"{len(jobs)} jobs" if isinstance(jobs, list) else jobs))
+    print(f"⏱️ {len(queries)} queries in {time.perf_counter() - start:.2f}s")
@@ -1,27 +1,258 @@
 import os
-import google.generativeai as genai
+import json
+import time
+import sqlite3
+import hashlib
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Set your Gemini API key
-api_key = os.getenv("GEMINI_API_KEY")
+MODEL_NAME = "models/gemini-1.5-flash"
+CACHE_DB = os.getenv("ROADMAP_CACHE_DB", "roadmap_cache.sqlite3")
+CACHE_TTL = float(os.getenv("ROADMAP_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+CACHE_MAX_ENTRIES = int(os.getenv("ROADMAP_CACHE_MAX_ENTRIES", "500"))
 
-# Configure Gemini API
-if not api_key:
-    raise ValueError("GOOGLE_API_KEY not found in environment.")
-genai.configure(api_key=api_key)
+_model = None
+_model_lock = threading.Lock()
 
-# Load model
-model = genai.GenerativeModel("models/gemini-1.5-flash")
+
+# Gemini is configured on first use, so importing this module (or testing it
+# with a fake model) needs neither the API key nor the SDK
+def get_model():
+    global _model
+    with _model_lock:
+        if _model is None:
+            import google.generativeai as genai
+
+            # Set your Gemini API key
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise ValueError("GEMINI_API_KEY not found in environment.")
+            genai.configure(api_key=api_key)
+            _model = genai.GenerativeModel(MODEL_NAME)
+    return _model
+
+
+def build_prompt(career_interest, skills):
+    return f"Generate a step-by-step career roadmap to become a {career_interest}, assuming the user already knows {skills}."
+
+
+# === Cache key: normalized interest + sorted, de-duplicated skills ===
+# "Data Scientist" / "python, ML" and "data  scientist" / "ml,Python" share one entry
+def normalize_request(career_interest, skills):
+    interest = " ".join(career_interest.lower().split())
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    skills = sorted({" ".join(skill.lower().split()) for skill in skills} - {""})
+    return interest, skills
+
+
+def cache_key(career_interest, skills):
+    interest, skills = normalize_request(career_interest, skills)
+    return hashlib.sha256(json.dumps([interest, skills]).encode()).hexdigest()
+
+
+# === Persistent roadmap cache (SQLite) with TTL and LRU eviction ===
+class RoadmapCache:
+    def __init__(self, db_path=CACHE_DB, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS roadmaps ("
+            "key TEXT PRIMARY KEY, interest TEXT NOT NULL, skills TEXT NOT NULL, text TEXT NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_roadmaps_last_used ON roadmaps (last_used)")
+        self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute("SELECT text, created FROM roadmaps WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._db.execute("DELETE FROM roadmaps WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE roadmaps SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, career_interest, skills, text):
+        interest, skills = normalize_request(career_interest, skills)
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO roadmaps VALUES (?, ?, ?, ?, ?, ?)",
+                (key, interest, ", ".join(skills), text, now, now),
+            )
+            # Least recently used entries beyond max_entries are dropped
+            self._db.execute(
+                "DELETE FROM roadmaps WHERE key IN ("
+                "SELECT key FROM roadmaps ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM roadmaps").fetchone()[0]
+        return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+
+# One generation in progress; every caller asking for the same roadmap reads
+# the chunks from here instead of starting its own model call
+class _InFlight:
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.condition = threading.Condition()
+
+    def read(self):
+        seen = 0
+        while True:
+            with self.condition:
+                while seen == len(self.chunks) and not self.done:
+                    self.condition.wait()
+                new_chunks = self.chunks[seen:]
+                seen = len(self.chunks)
+                done, error = self.done, self.error
+            yield from new_chunks
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+
+# === Roadmap generator: cache, request coalescing and streaming ===
+# `model` is anything with generate_content(prompt, stream=True) returning
+# chunks that have a .text, i.e. a Gemini GenerativeModel or a fake one.
+class RoadmapGenerator:
+    def __init__(self, model=None, cache=None):
+        self._model = model
+        self.cache = cache
+        self.model_calls = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        return self._model if self._model is not None else get_model()
+
+    def _run(self, key, career_interest, skills, in_flight):
+        try:
+            self.model_calls += 1
+            response = self.model.generate_content(build_prompt(career_interest, skills), stream=True)
+            for chunk in response:
+                with in_flight.condition:
+                    in_flight.chunks.append(chunk.text)
+                    in_flight.condition.notify_all()
+            if self.cache is not None:
+                self.cache.put(key, career_interest, skills, "".join(in_flight.chunks))
+        except Exception as e:
+            in_flight.error = e
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            with in_flight.condition:
+                in_flight.done = True
+                in_flight.condition.notify_all()
+
+    # Yields the roadmap text chunk by chunk. The model call runs in its own
+    # thread, so it finishes (and fills the cache) even if this reader stops early.
+    def stream(self, career_interest, skills):
+        key = cache_key(career_interest, skills)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                in_flight = self._in_flight[key] = _InFlight()
+                threading.Thread(target=self._run, args=(key, career_interest, skills, in_flight),
+                                 name="roadmap-generation", daemon=True).start()
+        yield from in_flight.read()
+
+    def generate(self, career_interest, skills):
+        return "".join(self.stream(career_interest, skills))
+
+
+_default_generator = None
+_generator_lock = threading.Lock()
+
+
+# One generator per process, so concurrent sessions share its in-flight requests
+def get_generator():
+    global _default_generator
+    with _generator_lock:
+        if _default_generator is None:
+            _default_generator = RoadmapGenerator(cache=RoadmapCache())
+    return _default_generator
 
 
 # ✅ This function MUST be at top-level
 def generate_roadmap(career_interest: str, skills: str) -> str:
-    prompt = f"Generate a step-by-step career roadmap to become a {career_interest}, assuming the user already knows {skills}."
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return get_generator().generate(career_interest, skills)
     except Exception as e:
         return f"❌ Error generating roadmap: {e}"
+
+
+# Streaming version for st.write_stream: yields text as Gemini produces it
+def stream_roadmap(career_interest: str, skills: str):
+    try:
+        yield from get_generator().stream(career_interest, skills)
+    except Exception as e:
+        yield f"\n\n❌ Error generating roadmap: {e}"
+
+
+if __name__ == "__main__":
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Demo with a fake model (no API key needed): python agents/roadmap_generator.py
+    class FakeChunk:
+        def __init__(self, text):
+            self.text = text
+
+    class FakeModel:
+        def generate_content(self, prompt, stream=False):
+            for step in range(1, 6):
+                time.sleep(0.1)
+                yield FakeChunk(f"Step {step} for: {prompt[:40]}...\n")
+
+    cache = RoadmapCache(os.path.join(tempfile.mkdtemp(), "roadmaps.sqlite3"), ttl=60, max_entries=2)
+    generator = RoadmapGenerator(model=FakeModel(), cache=cache)
+
+    # Four identical concurrent requests (different spelling) -> one model call
+    start = time.perf_counter()
+    requests_ = [("Data Scientist", "python, ML"), ("data  scientist", "ml, Python"),
+                 ("DATA SCIENTIST", "python,ml,"), ("Data Scientist", "Python , ML")]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        texts = list(pool.map(lambda args: generator.generate(*args), requests_))
+    print(f"🧵 4 concurrent requests -> {generator.model_calls} model call in {time.perf_counter() - start:.2f}s")
+    assert generator.model_calls == 1 and len(set(texts)) == 1
+
+    start = time.perf_counter()
+    generator.generate("data scientist", "python, ml")
+    print(f"💾 Cached repeat in {(time.perf_counter() - start) * 1000:.2f} ms; {cache.stats()}")
+
+    # Streaming: chunks arrive as the model produces them
+    start = time.perf_counter()
+    for chunk in generator.stream("AI Engineer", "python"):
+        print(f"  [{time.perf_counter() - start:.2f}s] {chunk.strip()}")
+
+    # LRU: max_entries=2, so the least recently used roadmap is evicted
+    generator.generate("Web Developer", "javascript")
+    print(f"🧹 After a third roadmap: {cache.stats()}; data scientist still cached: "
+          f"{cache.get(cache_key('Data Scientist', 'python, ML')) is not None}")
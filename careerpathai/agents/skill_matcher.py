@@ -1,8 +1,237 @@
+import math
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from difflib import get_close_matches
+import numpy as np
+
+# === Skill vocabulary ===
+# Canonical skill -> other ways postings write it. Matching happens on the
+# canonical form, so "ML", "machine-learning" and "Machine Learning" all hit
+# the same index entry.
+SKILL_SYNONYMS = {
+    "machine learning": ["ml", "machine-learning"],
+    "deep learning": ["dl", "deep-learning", "neural networks"],
+    "artificial intelligence": ["ai"],
+    "natural language processing": ["nlp"],
+    "computer vision": ["opencv"],
+    "data analytics": ["data analysis", "data analyst", "analytics"],
+    "data science": ["data scientist"],
+    "web development": ["web developer", "web dev", "frontend", "front end", "backend", "back end"],
+    "python": ["py", "python3"],
+    "javascript": ["js", "ecmascript"],
+    "typescript": ["ts"],
+    "node.js": ["node", "nodejs"],
+    "react": ["react.js", "reactjs"],
+    "sql": ["mysql", "postgresql", "postgres", "sqlite"],
+    "tensorflow": ["tf", "keras"],
+    "pytorch": ["torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "flutter": ["dart"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud"],
+    "kubernetes": ["k8s"],
+    "c++": ["cpp"],
+    "c#": ["csharp", "dotnet"],
+}
+
+# Job fields that are searched and how much a hit in each one counts
+FIELD_WEIGHTS = {"title": 3.0, "skills": 2.0, "description": 1.0}
+MAX_NGRAM = 3
+FUZZY_CUTOFF = 0.8
+INDEX_CACHE_SIZE = 16  # keyed job lists whose index is kept
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def tokenize(text):
+    return [token.rstrip(".") for token in _TOKEN_RE.findall(text.lower())]
+
+
+# Synonym phrase (tokenized the same way as job text) -> canonical skill
+_CANONICAL = {}
+for _skill, _synonyms in SKILL_SYNONYMS.items():
+    for _phrase in [_skill] + _synonyms:
+        _CANONICAL[" ".join(tokenize(_phrase))] = _skill
+
+# First words of the multi-word phrases, so only those positions build n-grams
+_PHRASE_STARTS = {phrase.split(" ")[0] for phrase in _CANONICAL if " " in phrase}
+
+
+# Index terms of a token list: every token, plus known multi-word phrases
+def _terms(tokens, max_n=MAX_NGRAM):
+    for i, token in enumerate(tokens):
+        yield _CANONICAL.get(token, token)
+        if token in _PHRASE_STARTS:
+            for n in range(2, max_n + 1):
+                gram = " ".join(tokens[i:i + n])
+                if gram in _CANONICAL:
+                    yield _CANONICAL[gram]
+
+
+def canonical_skill(phrase):
+    key = " ".join(tokenize(phrase))
+    return _CANONICAL.get(key, key)
+
+
+# "python, ML , Deep Learning" or ["python", "ml"] -> unique canonical skills, in order
+def parse_skills(user_skills):
+    if isinstance(user_skills, str):
+        user_skills = user_skills.split(",")
+    skills = []
+    for skill in user_skills:
+        skill = canonical_skill(skill)
+        if skill and skill not in skills:
+            skills.append(skill)
+    return skills
+
+
+# === Job normalization: every record becomes {field: text} once ===
+# Scraped jobs are dicts (title/company/location/url, optionally skills and
+# description); plain strings are treated as a job title.
+def normalize_job(job):
+    if isinstance(job, str):
+        return {"title": job}
+    fields = {}
+    for field in FIELD_WEIGHTS:
+        value = job.get(field)
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(value)
+        if value:
+            fields[field] = str(value)
+    return fields
+
+
+# === Inverted index: term -> posting arrays (job ids, best field weight) ===
+# Terms are single tokens plus the multi-word skills and synonyms above. A
+# multi-word skill we have no entry for ("spring boot") matches jobs that
+# contain all of its words.
+class SkillIndex:
+    def __init__(self, jobs=()):
+        self.jobs = []
+        self._ids = defaultdict(list)
+        self._weights = defaultdict(list)
+        self._arrays = {}
+        self.add(jobs)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def add(self, jobs):
+        for job in jobs:
+            job_id = len(self.jobs)
+            self.jobs.append(job)
+            terms = {}
+            for field, text in normalize_job(job).items():
+                weight = FIELD_WEIGHTS[field]
+                for term in _terms(tokenize(text)):
+                    if terms.get(term, 0.0) < weight:
+                        terms[term] = weight
+            for term, weight in terms.items():
+                self._ids[term].append(job_id)
+                self._weights[term].append(weight)
+        self._arrays.clear()
+
+    # Posting lists are turned into numpy arrays on first use after an add
+    def posting(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            if term in self._ids:
+                arrays = (np.asarray(self._ids[term], dtype=np.int64), np.asarray(self._weights[term], dtype=np.float64))
+            elif " " in term:
+                arrays = self._phrase_posting(term)
+            else:
+                arrays = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+            self._arrays[term] = arrays
+        return arrays
+
+    def _phrase_posting(self, phrase):
+        ids, weights = None, None
+        for word in phrase.split(" "):
+            word_ids, word_weights = self.posting(word)
+            if ids is None:
+                ids, weights = word_ids, word_weights
+                continue
+            ids, left, right = np.intersect1d(ids, word_ids, assume_unique=True, return_indices=True)
+            weights = np.minimum(weights[left], word_weights[right])
+        return ids, weights
+
+    # Rare skills say more about a posting than ones every job lists
+    def idf(self, df):
+        return math.log(1.0 + len(self.jobs) / (1 + df))
+
+    # Typos ("pyhton", "tensorflw") fall back to the closest indexed word; only
+    # done for single-word skills with no exact hit
+    def resolve(self, skill):
+        if len(self.posting(skill)[0]) or " " in skill:
+            return skill
+        close = get_close_matches(skill, [term for term in self._ids if " " not in term], n=1, cutoff=FUZZY_CUTOFF)
+        return close[0] if close else skill
+
+    # === Rank jobs by weighted skill overlap ===
+    # score = sum(field weight * idf) over matched skills, divided by the best
+    # possible score (every skill in a title), so it lies in [0, 1]
+    def search(self, user_skills, top_k=None, min_score=0.0):
+        skills = parse_skills(user_skills)
+        if not skills or not self.jobs:
+            return []
+
+        scores = np.zeros(len(self.jobs))
+        hits = []
+        best_possible = 0.0
+        for skill in skills:
+            ids, weights = self.posting(self.resolve(skill))
+            idf = self.idf(len(ids))
+            best_possible += FIELD_WEIGHTS["title"] * idf
+            scores[ids] += weights * idf  # ids are unique within a posting
+            hits.append((skill, ids))
+        scores /= best_possible
+
+        candidates = np.flatnonzero(scores > min_score)
+        if top_k is not None and len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+
+        results = []
+        for job_id in candidates:
+            matched = [skill for skill, ids in hits if _contains(ids, job_id)]
+            results.append({"job": self.jobs[job_id], "score": round(float(scores[job_id]), 4), "matched_skills": matched})
+        return results
+
+
+# Posting ids are sorted (jobs are appended in id order)
+def _contains(ids, job_id):
+    i = np.searchsorted(ids, job_id)
+    return i < len(ids) and ids[i] == job_id
+
+
+# === Shared indexes, one per scrape result ===
+# Building an index costs far more than one linear scan, so it only pays off
+# when the same jobs are searched again (every Streamlit rerun, other sessions
+# with the same query). The caller names the jobs with `key`, which must change
+# whenever they do; the dashboard passes the scrape-cache entry versions, so a
+# lookup does no per-job work. Without a key the index is built and not kept.
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def get_index(job_list, key=None):
+    if key is None:
+        return SkillIndex(job_list)
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+    index = SkillIndex(job_list)  # built outside the lock; a racing build just wins or loses
+    with _index_lock:
+        index = _index_cache.setdefault(key, index)
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+# Same call as before: jobs that match at least one skill, best match first
 def match_skills(user_skills, job_list):
-    matched_jobs = []
-    for job in job_list:
-        for skill in user_skills.split(','):
-            if skill.lower().strip() in job.lower():
-                matched_jobs.append(job)
-                break
-    return list(set(matched_jobs))
+    return [result["job"] for result in get_index(job_list).search(user_skills)]
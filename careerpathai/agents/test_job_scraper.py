@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add parent directory to system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.job_scraper import JobScraper, parse_jobs, scrape_jobs, scrape_many
+
+# Saved result pages, served by a local stub server (no network): pytest agents/
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+PAGES = {
+    "/python-jobs": "naukri_page1.html",
+    "/python-jobs-2": "naukri_page2.html",
+    "/data-scientist-jobs": "naukri_page1.html",
+}
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        StubHandler.hits += 1
+        time.sleep(0.2)  # pretend to be a slow site
+        name = PAGES.get(self.path)
+        if name is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = read_fixture(name).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def scraper():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StubHandler.hits = 0
+    yield JobScraper(base_url=f"http://127.0.0.1:{server.server_port}", requests_per_second=20)
+    server.shutdown()
+    server.server_close()
+
+
+# === Parser ===
+def test_parse_old_cards():
+    jobs = parse_jobs(read_fixture("naukri_page1.html"))
+    assert jobs[0]["title"] == "Python Developer"
+    assert jobs[0]["skills"] == ["Python", "Django", "SQL"]
+    assert jobs[0]["url"].startswith("https://www.naukri.com/")
+    assert jobs[1]["company"] == "DataWorks Analytics"
+
+
+def test_parse_new_cards():
+    jobs = parse_jobs(read_fixture("naukri_page2.html"))
+    assert jobs
+    assert all(set(job) == {"title", "company", "location", "url", "skills", "description"} for job in jobs)
+
+
+def test_parse_empty_page():
+    assert parse_jobs("<html><body>No results</body></html>") == []
+
+
+# === Scraper against the stub server ===
+def test_pages_are_merged_and_deduplicated(scraper):
+    jobs = scrape_jobs("python", scraper=scraper)
+    assert len(jobs) == 5
+    assert len({job["url"] for job in jobs}) == len(jobs)
+
+
+def test_missing_later_page_ends_results(scraper):
+    jobs = scrape_jobs("data scientist", scraper=scraper)
+    assert len(jobs) == len(parse_jobs(read_fixture("naukri_page1.html")))
+    assert scraper.cache.get(("data-scientist", scraper.pages)) is not None
+
+
+def test_unknown_query_is_an_error_message(scraper):
+    assert isinstance(scrape_jobs("cobol", scraper=scraper), str)
+
+
+def test_scrape_many_runs_queries_concurrently(scraper):
+    start = time.perf_counter()
+    results, version = scrape_many(["python", "data scientist", "cobol"], scraper=scraper)
+    elapsed = time.perf_counter() - start
+    assert len(results["python"]) == 5
+    assert isinstance(results["data scientist"], list)
+    assert isinstance(results["cobol"], str)
+    assert version is None  # the failed query was not cached
+    # 6 stub requests of 0.2s each; one at a time would take 1.2s
+    assert elapsed < 1.0
+
+
+def test_repeat_query_comes_from_the_cache(scraper):
+    first = scrape_jobs("python", scraper=scraper)
+    hits = StubHandler.hits
+    assert scrape_jobs("python", scraper=scraper) == first
+    assert StubHandler.hits == hits
+
+
+def test_cached_jobs_are_copies(scraper):
+    first = scrape_jobs("python", scraper=scraper)
+    first[0]["title"] = "changed"
+    first.pop()
+    second = scrape_jobs("python", scraper=scraper)
+    assert len(second) == 5
+    assert second[0]["title"] == "Python Developer"
+
+
+def test_version_names_the_cache_entry(scraper):
+    _, first = scrape_many(["python", "data scientist"], scraper=scraper)
+    _, again = scrape_many(["python", "data scientist"], scraper=scraper)
+    assert first is not None and first == again
+
+    scraper.cache.put(("python", scraper.pages), [])  # a refreshed entry is a new version
+    results, refreshed = scrape_many(["python", "data scientist"], scraper=scraper)
+    assert isinstance(results["python"], str)
+    assert refreshed != first
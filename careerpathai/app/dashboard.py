@@ -6,19 +6,20 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # Import custom agents
-from agents.job_scraper import scrape_jobs
-from agents.skill_matcher import match_skills
-from agents.roadmap_generator import generate_roadmap
-
-# Dummy certification mapping
-cert_map = {
-    "python": ["Coursera: Python for Everybody", "edX: Intro to Python"],
-    "machine learning": ["Google ML Crash Course", "Coursera: ML by Andrew Ng"],
-    "data analytics": ["Kaggle Data Cleaning", "IBM Data Analyst (Coursera)"],
-    "deep learning": ["FastAI Practical DL", "DeepLearning.AI Specialization"],
-    "flutter": ["AppBrewery Flutter Course", "Google Flutter Bootcamp (Udemy)"],
-    "web development": ["CS50 Web Dev", "Frontend Masters HTML/CSS"]
-}
+from agents.job_scraper import scrape_many
+from agents.skill_matcher import SkillIndex, get_index
+from agents.roadmap_generator import stream_roadmap
+from utils.data_loader import load_cert_map, lookup_certifications
+from utils.pipeline import Stage, run_stages
+from utils.sheets_logger import get_logger
+
+# Per-stage timeouts (seconds)
+JOBS_TIMEOUT = float(os.getenv("JOBS_TIMEOUT", "20"))
+CERTS_TIMEOUT = float(os.getenv("CERTS_TIMEOUT", "5"))
+ROADMAP_TIMEOUT = float(os.getenv("ROADMAP_TIMEOUT", "60"))
+
+# Certification mapping (see utils/data_loader.py)
+cert_map = load_cert_map()
 
 # Set Streamlit page config
 st.set_page_config(page_title="SkillBridge AI", layout="centered")
@@ -29,42 +30,109 @@ st.subheader("📥 Enter Your Profile")
 skills = st.text_area("🔧 Skills (comma-separated)", "python, machine learning, deep learning")
 interests = st.text_input("🎯 Career Interest (e.g., Data Scientist, AI Engineer)", "data scientist")
 
+
+# Each comma-separated interest is its own search; they are scraped together
+# and merged, a posting found by several of them listed once. Returns the
+# skill index over the merged jobs, or an error message. The index is kept
+# per set of scrape-cache entries, so reruns and other sessions searching the
+# same scrape skip the build.
+def scrape_interests(interests):
+    queries = [query.strip() for query in interests.split(",") if query.strip()]
+    if not queries:
+        return "❌ Enter a career interest to search jobs for."
+    results, version = scrape_many(queries)
+    jobs, seen, errors = [], set(), []
+    for result in results.values():
+        if isinstance(result, str):
+            errors.append(result)
+            continue
+        for job in result:
+            if job["url"] == "#" or job["url"] not in seen:
+                seen.add(job["url"])
+                jobs.append(job)
+    return get_index(jobs, key=version) if jobs else errors[0]
+
+
+# --- Section renderers ---
+def render_jobs(area, job_results):
+    # scrape_interests returns a SkillIndex, or an error message string
+    if isinstance(job_results, SkillIndex):
+        matches = job_results.search(skills, top_k=5)
+        if matches:
+            for match in matches:
+                job = match["job"]
+                area.markdown(
+                    f"✅ [{job['title']}]({job['url']}) — {job['company']}, {job['location']}  \n"
+                    f"Matched: {', '.join(match['matched_skills'])} · score {match['score']:.2f}"
+                )
+        else:
+            area.warning("No job roles matched your skills.")
+    else:
+        area.error(job_results if isinstance(job_results, str) else "❌ Job scraping failed. Try a different query or check internet connection.")
+
+
+def render_certs(area, suggested_certs):
+    if suggested_certs:
+        for cert in suggested_certs:
+            area.markdown(f"🔗 {cert}")
+    else:
+        area.info("No matching certifications found for your current skills.")
+
+
 # Submit button
 if st.button("🚀 Generate My Career Plan"):
-    with st.spinner("🧠 Thinking..."):
-
-        # --- JOB SCRAPING ---
-        st.subheader("📝 Matching Job Roles")
-        query = interests.lower().strip().replace(" ", "-")  # URL-safe
-        job_results = scrape_jobs(query)
-
-        if job_results and "Error" not in job_results[0]:
-            matched_jobs = match_skills(skills, job_results)
-            if matched_jobs:
-                for job in matched_jobs[:5]:
-                    st.markdown(f"✅ {job}")
+    logger = get_logger()
+    logger.log_query(interests, skills)
+
+    # Sections are laid out up front and filled in as each stage finishes
+    st.subheader("📝 Matching Job Roles")
+    jobs_area = st.container()
+    jobs_status = jobs_area.empty()
+    jobs_status.info("⏳ Scraping jobs...")
+
+    st.subheader("📚 Recommended Certifications")
+    certs_area = st.container()
+
+    st.subheader("🧭 Personalized Learning Roadmap")
+    roadmap_area = st.empty()
+    roadmap_area.info("⏳ Writing your roadmap...")
+
+    stages = [
+        Stage("jobs", lambda: scrape_interests(interests), timeout=JOBS_TIMEOUT),
+        Stage("certifications", lambda: lookup_certifications(skills, cert_map), timeout=CERTS_TIMEOUT),
+        Stage("roadmap", lambda: stream_roadmap(interests, skills), timeout=ROADMAP_TIMEOUT),
+    ]
+    areas = {"jobs": jobs_area, "certifications": certs_area, "roadmap": roadmap_area}
+
+    # The three stages run at the same time; the roadmap streams in chunk by chunk
+    roadmap_text = ""
+    timings = {}
+    for event in run_stages(stages):
+        name, kind = event["stage"], event["kind"]
+        if kind == "chunk":
+            roadmap_text += event["value"]
+            roadmap_area.markdown(roadmap_text)
+            continue
+
+        if name == "jobs":
+            jobs_status.empty()
+        if kind == "done":
+            if name == "jobs":
+                render_jobs(jobs_area, event["value"])
+            elif name == "certifications":
+                render_certs(certs_area, event["value"])
             else:
-                st.warning("No job roles matched your skills.")
-        else:
-            st.error("❌ Job scraping failed. Try a different query or check internet connection.")
-
-        # --- CERTIFICATIONS ---
-        st.subheader("📚 Recommended Certifications")
-        suggested_certs = []
-        for skill in skills.split(","):
-            s = skill.strip().lower()
-            if s in cert_map:
-                suggested_certs.extend(cert_map[s])
-        if suggested_certs:
-            for cert in set(suggested_certs):
-                st.markdown(f"🔗 {cert}")
+                roadmap_area.markdown("".join(event["value"]))
+        elif kind == "timeout":
+            message = f"⏱️ Timed out after {event['seconds']:.0f}s."
+            if name == "roadmap" and roadmap_text:
+                roadmap_area.markdown(roadmap_text + f"\n\n{message} It is still being generated in the background; try again shortly.")
+            else:
+                areas[name].warning(message)
         else:
-            st.info("No matching certifications found for your current skills.")
-
-        # --- ROADMAP GENERATION ---
-        st.subheader("🧭 Personalized Learning Roadmap")
-        try:
-            roadmap = generate_roadmap(interests, skills)
-            st.markdown(roadmap)
-        except Exception as e:
-            st.error(f"⚠️ Error generating roadmap: {e}")
+            areas[name].error(f"⚠️ Error in {name}: {event['error']}")
+
+        timings[name] = event["seconds"]
+        logger.log_stage(interests, name, "ok" if kind == "done" else kind, event["seconds"])
+
+    st.caption("⏱️ " + " · ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
@@ -0,0 +1,75 @@
+import os
+import csv
+import json
+from collections import defaultdict
+
+# Default certification mapping (skill -> courses); CERT_MAP_PATH can point to
+# a JSON file with the same shape to extend or override it
+DEFAULT_CERT_MAP = {
+    "python": ["Coursera: Python for Everybody", "edX: Intro to Python"],
+    "machine learning": ["Google ML Crash Course", "Coursera: ML by Andrew Ng"],
+    "data analytics": ["Kaggle Data Cleaning", "IBM Data Analyst (Coursera)"],
+    "deep learning": ["FastAI Practical DL", "DeepLearning.AI Specialization"],
+    "flutter": ["AppBrewery Flutter Course", "Google Flutter Bootcamp (Udemy)"],
+    "web development": ["CS50 Web Dev", "Frontend Masters HTML/CSS"]
+}
+
+
+# === Certification map ===
+def load_cert_map(path=None):
+    cert_map = {skill: list(certs) for skill, certs in DEFAULT_CERT_MAP.items()}
+    path = path or os.getenv("CERT_MAP_PATH")
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for skill, certs in json.load(f).items():
+                cert_map[skill.strip().lower()] = list(certs)
+    return cert_map
+
+
+def lookup_certifications(skills, cert_map):
+    suggested_certs = []
+    for skill in skills.split(","):
+        s = skill.strip().lower()
+        for cert in cert_map.get(s, []):
+            if cert not in suggested_certs:
+                suggested_certs.append(cert)
+    return suggested_certs
+
+
+# === Usage log written by utils/sheets_logger.py (CSV fallback) ===
+def load_usage_log(path="usage_log.csv"):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+# Per-stage latency summary: count, p50, p95 and timeout/error counts
+def stage_latency_summary(rows):
+    seconds = defaultdict(list)
+    failures = defaultdict(lambda: {"timeout": 0, "error": 0})
+    for row in rows:
+        if row.get("event") != "stage":
+            continue
+        if row.get("status") in ("timeout", "error"):
+            failures[row["stage"]][row["status"]] += 1
+        elif row.get("seconds"):
+            seconds[row["stage"]].append(float(row["seconds"]))
+
+    summary = {}
+    for stage in sorted(set(seconds) | set(failures)):
+        values = sorted(seconds[stage])
+        summary[stage] = {
+            "count": len(values),
+            "p50": values[len(values) // 2] if values else None,
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))] if values else None,
+            **failures[stage],
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    # Print stage latencies from the usage log: python utils/data_loader.py [usage_log.csv]
+    import sys
+    for stage, stats in stage_latency_summary(load_usage_log(*sys.argv[1:2])).items():
+        print(f"⏱️ {stage}: {stats}")
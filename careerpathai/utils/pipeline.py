@@ -0,0 +1,90 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by every dashboard run; a stage that blows its timeout keeps its worker
+# until it returns, so there is headroom for a few stuck calls
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="stage")
+
+
+# === One unit of work in the pipeline ===
+# `fn` takes no arguments. If it returns an iterator (e.g. a streamed roadmap),
+# every item is forwarded as a "chunk" event while the stage is still running.
+class Stage:
+    def __init__(self, name, fn, timeout=30.0):
+        self.name = name
+        self.fn = fn
+        self.timeout = timeout
+
+
+def _is_stream(value):
+    return hasattr(value, "__next__")
+
+
+def _run_stage(stage, events, started):
+    try:
+        value = stage.fn()
+        if _is_stream(value):
+            chunks = []
+            for chunk in value:
+                chunks.append(chunk)
+                events.put({"kind": "chunk", "stage": stage.name, "value": chunk})
+            value = chunks
+        events.put({"kind": "done", "stage": stage.name, "value": value,
+                    "seconds": time.perf_counter() - started})
+    except Exception as e:
+        events.put({"kind": "error", "stage": stage.name, "error": e,
+                    "seconds": time.perf_counter() - started})
+
+
+# === Run independent stages at the same time ===
+# Yields events in the caller's thread (so Streamlit can render them) as soon
+# as they happen:
+#   {"kind": "chunk",   "stage", "value"}             partial output of a streaming stage
+#   {"kind": "done",    "stage", "value", "seconds"}  stage finished
+#   {"kind": "error",   "stage", "error", "seconds"}  stage raised
+#   {"kind": "timeout", "stage", "seconds"}           stage ran past its timeout
+# Every stage ends with exactly one done / error / timeout event.
+def run_stages(stages):
+    events = queue.Queue()
+    started = time.perf_counter()
+    deadlines = {stage.name: started + stage.timeout for stage in stages}
+    for stage in stages:
+        _pool.submit(_run_stage, stage, events, started)
+
+    pending = set(deadlines)
+    while pending:
+        wait = min(deadlines[name] for name in pending) - time.perf_counter()
+        try:
+            event = events.get(timeout=max(wait, 0.0))
+        except queue.Empty:
+            now = time.perf_counter()
+            for name in sorted(pending):
+                if deadlines[name] <= now:
+                    pending.discard(name)
+                    yield {"kind": "timeout", "stage": name, "seconds": now - started}
+            continue
+
+        if event["stage"] not in pending:
+            continue  # late output from a stage that already timed out
+        if event["kind"] != "chunk":
+            pending.discard(event["stage"])
+        yield event
+
+
+if __name__ == "__main__":
+    # Demo: three stages of 0.3s, 0.5s (streaming) and 2s with a 1s timeout
+    def slow_stream():
+        for word in ["Learn", "build", "ship"]:
+            time.sleep(0.15)
+            yield word
+
+    stages = [
+        Stage("jobs", lambda: time.sleep(0.3) or ["job A", "job B"], timeout=2),
+        Stage("roadmap", slow_stream, timeout=2),
+        Stage("slow", lambda: time.sleep(2), timeout=1),
+    ]
+    start = time.perf_counter()
+    for event in run_stages(stages):
+        detail = event.get("value", event.get("error", ""))
+        print(f"[{time.perf_counter() - start:.2f}s] {event['stage']:<8} {event['kind']:<8} {detail}")
@@ -0,0 +1,110 @@
+import os
+import csv
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+
+# Where logged rows go: a Google Sheet when GOOGLE_SHEETS_CREDENTIALS (service
+# account JSON) and GOOGLE_SHEET_KEY are set, otherwise a local CSV file
+SHEETS_CREDENTIALS = os.getenv("GOOGLE_SHEETS_CREDENTIALS")
+SHEET_KEY = os.getenv("GOOGLE_SHEET_KEY")
+CSV_PATH = os.getenv("USAGE_LOG_CSV", "usage_log.csv")
+COLUMNS = ["timestamp", "event", "interest", "skills", "stage", "status", "seconds"]
+
+
+# === Asynchronous, batched sink for user queries and stage timings ===
+# log() only puts the row on a queue; a background thread writes rows in
+# batches (every `batch_size` rows or `flush_interval` seconds), so the
+# dashboard never waits on Sheets or disk.
+class SheetsLogger:
+    def __init__(self, credentials=SHEETS_CREDENTIALS, sheet_key=SHEET_KEY, csv_path=CSV_PATH,
+                 batch_size=20, flush_interval=5.0):
+        self.credentials = credentials
+        self.sheet_key = sheet_key
+        self.csv_path = csv_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+
+        self._queue = queue.Queue()
+        self._worksheet = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._worker, name="sheets-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # === Producers ===
+    def log(self, event, **fields):
+        row = {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "event": event}
+        row.update(fields)
+        self._queue.put([row.get(column, "") for column in COLUMNS])
+
+    def log_query(self, interest, skills):
+        self.log("query", interest=interest, skills=skills)
+
+    def log_stage(self, interest, stage, status, seconds):
+        self.log("stage", interest=interest, stage=stage, status=status, seconds=round(seconds, 3))
+
+    # === Background writer ===
+    def _worker(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0.05)))
+            except queue.Empty:
+                pass
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline or self._stop.is_set()):
+                self._write(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+        if batch:
+            self._write(batch)
+
+    def _write(self, rows):
+        if self.credentials and self.sheet_key:
+            try:
+                self._append_to_sheet(rows)
+                self.rows_written += len(rows)
+                return
+            except Exception as e:
+                print(f"⚠️ Google Sheets logging failed, writing to {self.csv_path} instead: {e}")
+        self._append_to_csv(rows)
+        self.rows_written += len(rows)
+
+    def _append_to_sheet(self, rows):
+        if self._worksheet is None:
+            import gspread
+            client = gspread.service_account(filename=self.credentials)
+            self._worksheet = client.open_by_key(self.sheet_key).sheet1
+            if not self._worksheet.row_values(1):
+                self._worksheet.append_row(COLUMNS)
+        self._worksheet.append_rows(rows, value_input_option="RAW")  # one API call per batch
+
+    def _append_to_csv(self, rows):
+        new_file = not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0
+        with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(COLUMNS)
+            writer.writerows(rows)
+
+    # Writes whatever is still queued; safe to call more than once
+    def close(self, timeout=10.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+_default_logger = None
+_default_lock = threading.Lock()
+
+
+def get_logger():
+    global _default_logger
+    with _default_lock:
+        if _default_logger is None:
+            _default_logger = SheetsLogger()
+    return _default_logger
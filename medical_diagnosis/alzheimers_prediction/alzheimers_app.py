@@ -1,68 +1,124 @@
 import streamlit as st
-import pydicom
-import numpy as np
-import tensorflow as tf
-from PIL import Image
+import pandas as pd
+import sys
 import os
+from inference_engine import AlzheimersInferenceEngine
 
-# === Load the model ===
+# Add the repository root to system path for the shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared.prediction_cache import PredictionCache
+
+st.set_page_config(page_title="Alzheimer's MRI Classifier", layout="centered")
+
+# === Load the model (once per server process, not on every rerun) ===
 MODEL_PATH = r"D:\medical_diagnosis\alzheimers_prediction\alzheimers_cnn_model.h5"
-if not os.path.exists(MODEL_PATH):
+CACHE_DB = os.getenv("PREDICTION_CACHE_DB")  # optional SQLite file for a persistent cache
+# Series folders can only be read from under this directory; unset = zip uploads only
+SERIES_ROOT = os.getenv("SERIES_ROOT")
+
+
+# Folder typed by the user -> real path inside SERIES_ROOT, or None if it is outside
+def resolve_series_folder(folder):
+    root = os.path.realpath(SERIES_ROOT)
+    path = os.path.realpath(os.path.join(root, folder))
+    if os.path.commonpath([root, path]) != root or not os.path.isdir(path):
+        return None
+    return path
+
+
+@st.cache_resource
+def get_engine(model_path):
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(model_path)
+    cache = PredictionCache(model_path, max_entries=2048, sqlite_path=CACHE_DB)
+    return AlzheimersInferenceEngine(model_path, cache=cache)
+
+
+try:
+    engine = get_engine(MODEL_PATH)
+except FileNotFoundError:
     st.error(f"❌ Model file not found at:\n{MODEL_PATH}\n\nPlease ensure the file exists.")
     st.stop()
 
-model = tf.keras.models.load_model(MODEL_PATH)
-
-# === Label encoder mapping ===
-label_map = {
-    0: "Alzheimer's Disease (AD)",
-    1: "Mild Cognitive Impairment (MCI)",
-    2: "Normal Control (NC)"
-}
-
-# === Preprocessing function ===
-def preprocess_image(file):
-    ext = file.name.lower().split('.')[-1]
-
-    if ext == 'dcm':
-        dicom = pydicom.dcmread(file)
-        pixel_array = dicom.pixel_array
-        normalized = (pixel_array - np.min(pixel_array)) / (np.max(pixel_array) - np.min(pixel_array))
-        image = (normalized * 255).astype(np.uint8)
-        image_resized = Image.fromarray(image).resize((128, 128)).convert("L")
-    elif ext in ['jpg', 'jpeg', 'png']:
-        image = Image.open(file).convert("L")
-        image_resized = image.resize((128, 128))
-    else:
-        raise ValueError("Unsupported file format.")
-
-    image_array = np.array(image_resized).reshape(1, 128, 128, 1) / 255.0
-    return image_resized, image_array
-
 # === Streamlit UI ===
-st.set_page_config(page_title="Alzheimer's MRI Classifier", layout="centered")
 st.title("🧠 Alzheimer's Disease Detection from MRI")
 st.markdown("Upload a **DICOM (.dcm)** or **JPG/PNG** MRI image to predict the disease stage.")
 
-# === File Upload ===
-uploaded_file = st.file_uploader("📤 Upload MRI Image", type=["dcm", "jpg", "jpeg", "png"])
+mode = st.radio("Mode", ["Single image", "Patient series (multiple files)", "Whole series (zip or folder)"],
+                horizontal=True)
+
+# === Single file ===
+if mode == "Single image":
+    uploaded_file = st.file_uploader("📤 Upload MRI Image", type=["dcm", "jpg", "jpeg", "png"])
+
+    if uploaded_file:
+        try:
+            result = engine.predict_batch([uploaded_file])[0]
+
+            # Display image
+            preview = result["image"] if result["image"] is not None else engine.preview(uploaded_file)
+            st.image(preview, caption="🖼️ MRI Image Preview", width=300)
+
+            # Show results
+            st.success(f"🧬 *Prediction:* {result['class']}")
+            st.info(f"🔢 Model confidence: {result['confidence']:.2f}%")
+
+        except Exception as e:
+            st.error(f"❌ Error processing the file.\n\n**Details:**\n{e}")
+
+# === Multiple files: the whole series goes through one batched forward pass ===
+elif mode == "Patient series (multiple files)":
+    uploaded_files = st.file_uploader("📤 Upload MRI Slices", type=["dcm", "jpg", "jpeg", "png"],
+                                      accept_multiple_files=True)
+
+    if uploaded_files:
+        try:
+            results = engine.predict_batch(uploaded_files)
+
+            st.dataframe(pd.DataFrame(
+                [{"File": r["file"], "Prediction": r["class"], "Confidence (%)": round(r["confidence"], 2)}
+                 for r in results]
+            ))
+            previews = [r["image"] if r["image"] is not None else engine.preview(f)
+                        for r, f in zip(results, uploaded_files)]
+            st.image(previews, caption=[r["file"] for r in results], width=120)
+
+        except Exception as e:
+            st.error(f"❌ Error processing the files.\n\n**Details:**\n{e}")
+
+# === Whole DICOM series: sorted by InstanceNumber, aggregated into one verdict ===
+else:
+    uploaded_zip = st.file_uploader("📦 Upload a zipped DICOM series", type=["zip"])
+    source = uploaded_zip
+    if SERIES_ROOT and not uploaded_zip:
+        folder = st.text_input(f"📁 ...or a series folder under {SERIES_ROOT}").strip()
+        if folder:
+            source = resolve_series_folder(folder)
+            if source is None:
+                st.error(f"❌ No series folder '{folder}' under {SERIES_ROOT}.")
 
-if uploaded_file:
-    try:
-        # Preprocess image
-        image_display, processed_image = preprocess_image(uploaded_file)
+    if source:
+        try:
+            series = engine.predict_series(source)
 
-        # Display image
-        st.image(image_display, caption="🖼️ MRI Image Preview", width=300)
+            st.success(f"🧬 *Patient-level prediction:* {series['class']}")
+            st.info(f"🔢 Mean slice probability: {series['confidence']:.2f}% "
+                    f"over {len(series['slices'])} slices")
+            st.bar_chart(pd.Series(series["probabilities"]))
 
-        # Predict
-        prediction = model.predict(processed_image)
-        predicted_class = label_map[np.argmax(prediction)]
-        confidence = np.max(prediction) * 100
+            timings = series["timings_ms"]
+            st.caption(
+                f"⏱️ Read {timings['read_per_slice']:.1f} ms/slice · "
+                f"Preprocess {timings['preprocess_per_slice']:.1f} ms/slice · "
+                f"Predict {timings['predict_per_slice']:.1f} ms/slice · "
+                f"Total {timings['total']:.0f} ms" + (" (cached result)" if series["cached"] else "")
+            )
 
-        # Show results
-        st.success(f"🧬 *Prediction:* {predicted_class}")
-        st.info(f"🔢 Model confidence: {confidence:.2f}%")
+            st.dataframe(pd.DataFrame(
+                [{"Instance": s["instance_number"], "File": s["file"], "Prediction": s["class"],
+                  "Confidence (%)": round(s["confidence"], 2), "Read (ms)": round(s["read_ms"], 2)}
+                 for s in series["slices"]]
+            ))
 
-    except Exception as e:
-        st.error(f"❌ Error processing the file.\n\n**Details:**\n{e}")
+        except Exception as e:
+            st.error(f"❌ Error processing the series.\n\n**Details:**\n{e}")
@@ -1,18 +1,18 @@
 import os
 import numpy as np
-import pydicom
-import cv2
 from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout
-from tensorflow.keras.utils import to_categorical
 from tensorflow.keras.callbacks import EarlyStopping
+from mri_ingest import load_images_parallel, decode_slice
+from mri_store import build_store, load_store, store_is_current, MRISequence
+from mri_split import patient_split, patient_kfold, describe_split
 
 # ✅ Step 1: Load and preprocess mixed image formats (.dcm and .jpg/.jpeg/.png)
 def load_mixed_images(dataset_path, categories):
     images = []
     labels = []
+    patients = []
 
     print("🧠 Loading medical images (.dcm, .jpg, .jpeg, .png)...")
     valid_image_extensions = [".dcm", ".jpg", ".jpeg", ".png"]
@@ -33,20 +33,15 @@ def load_mixed_images(dataset_path, categories):
                 file_path = os.path.join(patient_path, file)
                 ext = os.path.splitext(file)[1].lower()
 
+                if ext not in valid_image_extensions:
+                    continue  # Skip unsupported formats
+
                 try:
-                    if ext == ".dcm":
-                        ds = pydicom.dcmread(file_path)
-                        img = ds.pixel_array
-                    elif ext in [".jpg", ".jpeg", ".png"]:
-                        img = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
-                    else:
-                        continue  # Skip unsupported formats
-
-                    # Resize and normalize
-                    img_resized = cv2.resize(img, (128, 128))
-                    img_normalized = img_resized.astype(np.float32) / 255.0
+                    # Shared resize + normalize (min/max for DICOM, /255 for JPG/PNG)
+                    img_normalized = decode_slice(file_path)[0, :, :, 0]
                     images.append(img_normalized)
                     labels.append(category)
+                    patients.append(f"{category}/{patient_folder}")
                     count += 1
                 except Exception as e:
                     print(f"⚠️ Error in {file_path}: {e}")
@@ -55,46 +50,89 @@ def load_mixed_images(dataset_path, categories):
 
     print(f"🔍 Total samples loaded: {len(images)}")
     print(f"Unique labels found: {set(labels)}")
-    return np.array(images), np.array(labels)
-
-# ✅ Step 2: Paths and labels
-dataset_path = r"D:\medical_diagnosis\Alzheimers disease mri images"
-categories = ['AD', 'MCI', 'NC']
-
-# ✅ Step 3: Load images
-images, labels = load_mixed_images(dataset_path, categories)
-
-# ✅ Step 4: Encode labels and reshape
-label_encoder = LabelEncoder()
-labels_encoded = label_encoder.fit_transform(labels)
-images = images.reshape(-1, 128, 128, 1)
-
-# ✅ Step 5: Train-test split
-X_train, X_test, y_train, y_test = train_test_split(images, labels_encoded, test_size=0.2, random_state=42)
-y_train = to_categorical(y_train, num_classes=3)
-y_test = to_categorical(y_test, num_classes=3)
-
-# ✅ Step 6: CNN model
-model = Sequential([
-    Conv2D(32, (3, 3), activation='relu', input_shape=(128, 128, 1)),
-    MaxPooling2D(pool_size=(2, 2)),
-    Conv2D(64, (3, 3), activation='relu'),
-    MaxPooling2D(pool_size=(2, 2)),
-    Flatten(),
-    Dense(128, activation='relu'),
-    Dropout(0.3),
-    Dense(3, activation='softmax')
-])
-
-# ✅ Step 7: Compile and Train
-model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
-early_stop = EarlyStopping(patience=5, restore_best_weights=True)
-model.fit(X_train, y_train, epochs=20, batch_size=16, validation_split=0.2, callbacks=[early_stop])
-
-# ✅ Step 8: Evaluate
-loss, accuracy = model.evaluate(X_test, y_test)
-print(f"📊 Test Accuracy: {accuracy * 100:.2f}%")
-
-# ✅ Step 9: Save model
-model.save("alzheimers_cnn_model.h5")
-print("✅ Model saved as alzheimers_cnn_model.h5")
+    return np.array(images), np.array(labels), np.array(patients)
+
+# Guarded so process-pool workers can re-import this module safely
+if __name__ == "__main__":
+    # ✅ Step 2: Paths and labels
+    dataset_path = r"D:\medical_diagnosis\Alzheimers disease mri images"
+    categories = ['AD', 'MCI', 'NC']
+    USE_STORE = True          # stream batches from the on-disk uint8 store
+    STORE_DIR = "mri_store"
+    PARALLEL_INGEST = True    # in-RAM mode only: parallel + cached loader
+    CACHE_DIR = "mri_cache"
+    CV_FOLDS = 0              # > 1 runs patient-level k-fold CV before the final fit
+    SEED = 42
+
+    # ✅ Step 3: Load images (memmapped store, or fully in RAM)
+    if USE_STORE:
+        if not store_is_current(STORE_DIR):
+            build_store(dataset_path, categories, STORE_DIR)
+        slices, store_index = load_store(STORE_DIR)
+        pixels, rows, scale = slices, store_index["rows"], 1.0 / 255.0
+        labels, patients = store_index["categories"], store_index["patients"]
+        print(f"🔍 Total samples in store: {len(rows)}")
+    else:
+        if PARALLEL_INGEST:
+            images, labels, patients = load_images_parallel(dataset_path, categories, cache_dir=CACHE_DIR)
+        else:
+            images, labels, patients = load_mixed_images(dataset_path, categories)
+        pixels, rows, scale = images.reshape(-1, 128, 128, 1), np.arange(len(images)), 1.0
+
+    # ✅ Step 4: Encode labels
+    label_encoder = LabelEncoder()
+    labels_encoded = label_encoder.fit_transform(labels)
+
+    # ✅ Step 5: Patient-level train / validation / test split on sample indices
+    train_ids, test_ids = patient_split(patients, labels_encoded, test_size=0.2, seed=SEED)
+    train_ids, val_ids = patient_split(patients, labels_encoded, test_size=0.2, seed=SEED, ids=train_ids)
+    describe_split(patients, labels_encoded, train=train_ids, val=val_ids, test=test_ids)
+
+    def make_sequence(ids, shuffle=False):
+        return MRISequence(pixels, rows[ids], labels_encoded[ids], num_classes=3,
+                           batch_size=16, shuffle=shuffle, scale=scale, seed=SEED)
+
+    # ✅ Step 6: CNN model
+    def build_model():
+        model = Sequential([
+            Conv2D(32, (3, 3), activation='relu', input_shape=(128, 128, 1)),
+            MaxPooling2D(pool_size=(2, 2)),
+            Conv2D(64, (3, 3), activation='relu'),
+            MaxPooling2D(pool_size=(2, 2)),
+            Flatten(),
+            Dense(128, activation='relu'),
+            Dropout(0.3),
+            Dense(3, activation='softmax')
+        ])
+        model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
+        return model
+
+    # ✅ Step 6b: Optional k-fold cross-validation over the training patients
+    if CV_FOLDS > 1:
+        fold_scores = []
+        for fold, (fold_train, fold_val) in enumerate(
+                patient_kfold(patients, labels_encoded, n_splits=CV_FOLDS, seed=SEED, ids=train_ids), 1):
+            fold_model = build_model()
+            fold_model.fit(make_sequence(fold_train, shuffle=True), validation_data=make_sequence(fold_val),
+                           epochs=20, callbacks=[EarlyStopping(patience=5, restore_best_weights=True)])
+            _, fold_accuracy = fold_model.evaluate(make_sequence(fold_val))
+            fold_scores.append(fold_accuracy)
+            print(f"📁 Fold {fold}/{CV_FOLDS} accuracy: {fold_accuracy * 100:.2f}%")
+        print(f"📊 CV accuracy: {np.mean(fold_scores) * 100:.2f}% ± {np.std(fold_scores) * 100:.2f}%")
+
+    # ✅ Step 7: Compile and Train
+    train_seq = make_sequence(train_ids, shuffle=True)
+    val_seq = make_sequence(val_ids)
+    test_seq = make_sequence(test_ids)
+
+    model = build_model()
+    early_stop = EarlyStopping(patience=5, restore_best_weights=True)
+    model.fit(train_seq, validation_data=val_seq, epochs=20, callbacks=[early_stop])
+
+    # ✅ Step 8: Evaluate
+    loss, accuracy = model.evaluate(test_seq)
+    print(f"📊 Test Accuracy: {accuracy * 100:.2f}%")
+
+    # ✅ Step 9: Save model
+    model.save("alzheimers_cnn_model.h5")
+    print("✅ Model saved as alzheimers_cnn_model.h5")
@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import numpy as np
+import pydicom
+import cv2
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Add the repository root to system path for the shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared.image_preprocessing import preprocess_batch, to_uint8
+
+IMG_SIZE = 128
+VALID_IMAGE_EXTENSIONS = [".dcm", ".jpg", ".jpeg", ".png"]
+
+# Cache layout: pixels.npy holds the decoded (N,128,128,1) float32 slices and
+# index.json maps file path -> [mtime_ns, size, row in pixels.npy]. Bump
+# CACHE_VERSION whenever the preprocessing changes so old caches are ignored.
+CACHE_PIXELS = "pixels.npy"
+CACHE_INDEX = "index.json"
+CACHE_VERSION = 2
+
+
+# === Scan the dataset: one (file_path, category, patient_id) entry per slice ===
+def scan_dataset(dataset_path, categories):
+    entries = []
+    for category in categories:
+        category_path = os.path.join(dataset_path, category)
+        if not os.path.exists(category_path):
+            print(f"❌ Folder not found: {category_path}")
+            continue
+
+        for patient_folder in sorted(os.listdir(category_path)):
+            patient_path = os.path.join(category_path, patient_folder)
+            if not os.path.isdir(patient_path):
+                continue
+
+            patient_id = f"{category}/{patient_folder}"
+            for file in sorted(os.listdir(patient_path)):
+                ext = os.path.splitext(file)[1].lower()
+                if ext in VALID_IMAGE_EXTENSIONS:
+                    entries.append((os.path.join(patient_path, file), category, patient_id))
+    return entries
+
+
+# === Read the raw pixel data of a .dcm or grayscale image slice ===
+def read_slice(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".dcm":
+        return pydicom.dcmread(file_path).pixel_array
+
+    img = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        raise ValueError("could not read image")
+    return img
+
+
+# DICOM slices are min/max normalized, grayscale images are scaled by 1/255
+def slice_mode(file_path):
+    return "minmax" if file_path.lower().endswith(".dcm") else "unit"
+
+
+# === Decode a single slice into a float32 (1,128,128,1) buffer ===
+def decode_slice(file_path, out=None):
+    return preprocess_batch([read_slice(file_path)], out=out, channels=1, mode=slice_mode(file_path))
+
+
+# Runs inside a worker process: decode every slice of one patient folder
+def _decode_folder(file_paths):
+    decoded = np.zeros((len(file_paths), IMG_SIZE, IMG_SIZE, 1), dtype=np.float32)
+    failed = []
+    for i, file_path in enumerate(file_paths):
+        try:
+            decode_slice(file_path, out=decoded[i:i + 1])
+        except Exception as e:
+            failed.append((i, str(e)))
+    return decoded, failed
+
+
+# Runs inside a worker process: quantize every slice of one patient folder to uint8
+def pack_folder(file_paths):
+    packed = np.zeros((len(file_paths), IMG_SIZE, IMG_SIZE), dtype=np.uint8)
+    scratch = np.empty((1, IMG_SIZE, IMG_SIZE, 1), dtype=np.float32)
+    failed = []
+    for i, file_path in enumerate(file_paths):
+        try:
+            packed[i] = to_uint8(decode_slice(file_path, out=scratch)[0, :, :, 0])
+        except Exception as e:
+            failed.append((i, str(e)))
+    return packed, failed
+
+
+def _file_key(file_path):
+    stat = os.stat(file_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _load_cache(cache_dir):
+    index_path = os.path.join(cache_dir, CACHE_INDEX)
+    pixels_path = os.path.join(cache_dir, CACHE_PIXELS)
+    if not (os.path.exists(index_path) and os.path.exists(pixels_path)):
+        return {}, None
+
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+        if index.get("version") != CACHE_VERSION:
+            print(f"♻️ Ignoring cache in {cache_dir} built by an older preprocessing version")
+            return {}, None
+        pixels = np.load(pixels_path, mmap_mode="r")
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable cache in {cache_dir}: {e}")
+        return {}, None
+    return index["files"], pixels
+
+
+def _save_cache(cache_dir, file_paths, keys, images):
+    os.makedirs(cache_dir, exist_ok=True)
+    index = {
+        "version": CACHE_VERSION,
+        "files": {path: key + [row] for row, (path, key) in enumerate(zip(file_paths, keys))},
+    }
+
+    # Write to temp files first so an interrupted run never leaves a half-written cache
+    pixels_tmp = os.path.join(cache_dir, "pixels.tmp.npy")
+    index_tmp = os.path.join(cache_dir, "index.tmp.json")
+    np.save(pixels_tmp, images)
+    with open(index_tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(pixels_tmp, os.path.join(cache_dir, CACHE_PIXELS))
+    os.replace(index_tmp, os.path.join(cache_dir, CACHE_INDEX))
+
+
+# === Parallel, cached replacement for load_mixed_images ===
+# Patient folders are decoded in a process pool and written straight into one
+# preallocated float32 (N,128,128,1) array. With cache_dir set, slices whose
+# path, mtime and size match the previous run are reused instead of decoded.
+def load_images_parallel(dataset_path, categories, cache_dir=None, workers=None):
+    print("🧠 Loading medical images (.dcm, .jpg, .jpeg, .png) in parallel...")
+    entries = scan_dataset(dataset_path, categories)
+    n = len(entries)
+
+    images = np.empty((n, IMG_SIZE, IMG_SIZE, 1), dtype=np.float32)
+    labels = np.array([category for _, category, _ in entries])
+    patients = np.array([patient_id for _, _, patient_id in entries])
+    keys = [_file_key(file_path) for file_path, _, _ in entries]
+    keep = np.ones(n, dtype=bool)
+
+    cached_index, cached_pixels = _load_cache(cache_dir) if cache_dir else ({}, None)
+
+    # Copy cache hits, group everything else by patient folder
+    pending = {}
+    for row, (file_path, _, patient_id) in enumerate(entries):
+        hit = cached_index.get(file_path)
+        if hit is not None and hit[:2] == keys[row]:
+            images[row] = cached_pixels[hit[2]]
+        else:
+            pending.setdefault(patient_id, []).append(row)
+    del cached_pixels  # release the memmap before the cache file is replaced
+
+    n_pending = sum(len(rows) for rows in pending.values())
+    print(f"♻️ Reused {n - n_pending} cached slices, decoding {n_pending} new or changed slices")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_decode_folder, [entries[row][0] for row in rows]): rows
+                for rows in pending.values()
+            }
+            for future in as_completed(futures):
+                rows = futures[future]
+                decoded, failed = future.result()
+                images[rows] = decoded
+                for i, error in failed:
+                    print(f"⚠️ Error in {entries[rows[i]][0]}: {error}")
+                    keep[rows[i]] = False
+
+    if not keep.all():
+        images = images[keep]
+        labels = labels[keep]
+        patients = patients[keep]
+        keys = [key for key, ok in zip(keys, keep) if ok]
+        entries = [entry for entry, ok in zip(entries, keep) if ok]
+
+    if cache_dir and (n_pending or len(cached_index) != len(entries)):
+        _save_cache(cache_dir, [file_path for file_path, _, _ in entries], keys, images)
+
+    for category in categories:
+        print(f"✅ Loaded {int(np.sum(labels == category))} images from category '{category}'")
+    print(f"🔍 Total samples loaded: {len(images)}")
+    print(f"Unique labels found: {set(labels)}")
+    return images, labels, patients
@@ -0,0 +1,32 @@
+import numpy as np
+from sklearn.model_selection import StratifiedGroupKFold
+
+# All splits group slices by patient folder ("AD/17f") so no patient ever has
+# slices on both sides, and return index arrays into the shared image store
+# instead of copies of the pixel data.
+
+
+# === Seeded, stratified k-fold over patients ===
+def patient_kfold(patients, labels, n_splits=5, seed=42, ids=None):
+    patients = np.asarray(patients)
+    labels = np.asarray(labels)
+    ids = np.arange(len(labels)) if ids is None else np.asarray(ids)
+
+    skf = StratifiedGroupKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    for train_pos, val_pos in skf.split(ids, labels[ids], groups=patients[ids]):
+        yield ids[train_pos], ids[val_pos]
+
+
+# === Single patient-level hold-out split (first fold of the k-fold) ===
+def patient_split(patients, labels, test_size=0.2, seed=42, ids=None):
+    n_splits = max(2, int(round(1.0 / test_size)))
+    return next(patient_kfold(patients, labels, n_splits=n_splits, seed=seed, ids=ids))
+
+
+# === Quick sanity check: how many patients / slices landed in each split ===
+def describe_split(patients, labels, **splits):
+    patients = np.asarray(patients)
+    labels = np.asarray(labels)
+    for name, ids in splits.items():
+        counts = {str(label): int(np.sum(labels[ids] == label)) for label in np.unique(labels)}
+        print(f"🧩 {name}: {len(np.unique(patients[ids]))} patients, {len(ids)} slices, per class {counts}")
@@ -0,0 +1,122 @@
+import os
+import json
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tensorflow.keras.utils import Sequence
+from mri_ingest import IMG_SIZE, CACHE_VERSION, scan_dataset, pack_folder
+
+# Store layout: slices.npy is a (N,128,128) uint8 array opened as a memmap,
+# index.json holds one path / category / patient entry per stored row plus
+# the preprocessing version the store was built with
+STORE_SLICES = "slices.npy"
+STORE_INDEX = "index.json"
+
+
+# === One-time preprocessing step: decode the dataset into the on-disk store ===
+def build_store(dataset_path, categories, store_dir, workers=None):
+    print(f"📦 Building MRI store in {store_dir}...")
+    entries = scan_dataset(dataset_path, categories)
+    os.makedirs(store_dir, exist_ok=True)
+
+    slices = np.lib.format.open_memmap(
+        os.path.join(store_dir, STORE_SLICES), mode="w+",
+        dtype=np.uint8, shape=(len(entries), IMG_SIZE, IMG_SIZE)
+    )
+    keep = np.ones(len(entries), dtype=bool)
+
+    folders = {}
+    for row, (_, _, patient_id) in enumerate(entries):
+        folders.setdefault(patient_id, []).append(row)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(pack_folder, [entries[row][0] for row in rows]): rows
+            for rows in folders.values()
+        }
+        for future in as_completed(futures):
+            rows = futures[future]
+            packed, failed = future.result()
+            slices[rows[0]:rows[-1] + 1] = packed  # a folder's rows are contiguous
+            for i, error in failed:
+                print(f"⚠️ Error in {entries[rows[i]][0]}: {error}")
+                keep[rows[i]] = False
+
+    slices.flush()
+    del slices
+
+    # Rows that failed to decode stay in slices.npy but are left out of the index
+    kept_rows = np.flatnonzero(keep)
+    index = {
+        "version": CACHE_VERSION,
+        "rows": kept_rows.tolist(),
+        "paths": [entries[row][0] for row in kept_rows],
+        "categories": [entries[row][1] for row in kept_rows],
+        "patients": [entries[row][2] for row in kept_rows],
+    }
+    with open(os.path.join(store_dir, STORE_INDEX), "w") as f:
+        json.dump(index, f)
+
+    print(f"✅ Stored {len(kept_rows)} slices from {len(folders)} patient folders")
+    return index
+
+
+# A store is reusable only if it was built with the current preprocessing
+def store_is_current(store_dir):
+    index_path = os.path.join(store_dir, STORE_INDEX)
+    if not os.path.exists(index_path):
+        return False
+    with open(index_path, "r") as f:
+        return json.load(f).get("version") == CACHE_VERSION
+
+
+# === Open the store: memmapped slices plus the metadata index ===
+def load_store(store_dir):
+    slices = np.load(os.path.join(store_dir, STORE_SLICES), mmap_mode="r")
+    with open(os.path.join(store_dir, STORE_INDEX), "r") as f:
+        index = json.load(f)
+
+    index.pop("version", None)
+    index = {key: np.array(values) for key, values in index.items()}
+    return slices, index
+
+
+# === Keras loader that reads batches from the memmap on demand ===
+# `pixels` is any (N,128,128[,1]) array: the uint8 store (scale=1/255) or
+# an already normalized float32 array (scale=1.0). Only one batch is ever
+# materialized, so memory stays flat however large the store grows.
+class MRISequence(Sequence):
+    def __init__(self, pixels, rows, labels, num_classes, batch_size=16,
+                 shuffle=False, scale=1.0 / 255.0, seed=42, **kwargs):
+        super().__init__(**kwargs)
+        self.pixels = pixels
+        self.rows = np.asarray(rows)
+        self.labels = np.asarray(labels)
+        self.num_classes = num_classes
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.scale = np.float32(scale)
+        self.rng = np.random.default_rng(seed)
+        self.order = np.arange(len(self.rows))
+        if self.shuffle:
+            self.rng.shuffle(self.order)
+
+    def __len__(self):
+        return math.ceil(len(self.rows) / self.batch_size)
+
+    def __getitem__(self, idx):
+        batch = self.order[idx * self.batch_size:(idx + 1) * self.batch_size]
+        # Sorted reads keep memmap access sequential
+        batch = batch[np.argsort(self.rows[batch])]
+
+        x = np.empty((len(batch), IMG_SIZE, IMG_SIZE, 1), dtype=np.float32)
+        x[..., 0] = self.pixels[self.rows[batch]].reshape(len(batch), IMG_SIZE, IMG_SIZE)
+        x *= self.scale
+
+        y = np.zeros((len(batch), self.num_classes), dtype=np.float32)
+        y[np.arange(len(batch)), self.labels[batch]] = 1.0
+        return x, y
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.order)
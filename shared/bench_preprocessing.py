@@ -0,0 +1,108 @@
+import io
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import cv2
+from PIL import Image
+
+# Add the repository root to system path for the shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.image_preprocessing import IMG_SIZE, decode_image_bytes, preprocess_batch
+
+# Microbenchmark: per-image cost of shared/image_preprocessing.py against the
+# preprocessing code it replaced. Synthetic inputs, so it runs anywhere:
+#   python shared/bench_preprocessing.py
+
+
+# === Previous implementations, copied verbatim ===
+def legacy_waste_backend(image_bytes):
+    img = Image.open(io.BytesIO(image_bytes)).convert("RGB").resize((128, 128))
+    img = np.array(img) / 255.0
+    return np.expand_dims(img, axis=0)
+
+
+def legacy_app_dicom(pixel_array):
+    normalized = (pixel_array - np.min(pixel_array)) / (np.max(pixel_array) - np.min(pixel_array))
+    image = (normalized * 255).astype(np.uint8)
+    image_resized = Image.fromarray(image).resize((IMG_SIZE, IMG_SIZE)).convert("L")
+    return np.array(image_resized).reshape(1, IMG_SIZE, IMG_SIZE, 1) / 255.0
+
+
+def legacy_training_slice(img):
+    img_resized = cv2.resize(img, (128, 128))
+    return img_resized.astype(np.float32) / 255.0
+
+
+# === Timing helpers ===
+def per_image_us(fn, inputs, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(inputs)
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs) * 1e6
+
+
+def peak_kib(fn, inputs):
+    fn(inputs[:2])  # warm per-thread scratch buffers
+    tracemalloc.start()
+    fn(inputs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def report(name, legacy, shared, inputs):
+    legacy_us, shared_us = per_image_us(legacy, inputs), per_image_us(shared, inputs)
+    print(f"{name:<34} {legacy_us:>10.1f} {shared_us:>10.1f} {legacy_us / shared_us:>7.2f}x "
+          f"{peak_kib(legacy, inputs):>11.0f} {peak_kib(shared, inputs):>11.0f}")
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 64
+
+    # Waste photos: 512x384 JPEGs, decoded and preprocessed one by one
+    photos = []
+    for _ in range(n):
+        pixels = rng.integers(0, 256, (384, 512, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(cv2.GaussianBlur(pixels, (9, 9), 0)).save(buffer, format="JPEG", quality=90)
+        photos.append(buffer.getvalue())
+
+    # MRI slices: 256x256 uint16 DICOM pixel data and 256x256 grayscale images
+    slices = [rng.integers(0, 4096, (256, 256), dtype=np.uint16) for _ in range(n)]
+    grays = [rng.integers(0, 256, (256, 256), dtype=np.uint8) for _ in range(n)]
+
+    photo_batch = np.empty((n, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+    slice_batch = np.empty((n, IMG_SIZE, IMG_SIZE, 1), dtype=np.float32)
+
+    print(f"{'per image':<34} {'legacy µs':>10} {'shared µs':>10} {'speedup':>8} "
+          f"{'legacy KiB':>11} {'shared KiB':>11}")
+    report(
+        "waste backend (JPEG decode + prep)",
+        lambda xs: [legacy_waste_backend(x) for x in xs],
+        lambda xs: [preprocess_batch([decode_image_bytes(x)], out=photo_batch[i:i + 1]) for i, x in enumerate(xs)],
+        photos,
+    )
+    decoded = [decode_image_bytes(x) for x in photos]
+    report(
+        "waste prep only (decoded RGB batch)",
+        lambda xs: [np.array(Image.fromarray(x).resize((128, 128))) / 255.0 for x in xs],
+        lambda xs: preprocess_batch(xs, out=photo_batch),
+        decoded,
+    )
+    report(
+        "alzheimers app (DICOM min/max)",
+        lambda xs: [legacy_app_dicom(x) for x in xs],
+        lambda xs: preprocess_batch(xs, out=slice_batch, channels=1, mode="minmax"),
+        slices,
+    )
+    report(
+        "alzheimers training (JPG/PNG /255)",
+        lambda xs: [legacy_training_slice(x) for x in xs],
+        lambda xs: preprocess_batch(xs, out=slice_batch, channels=1, mode="unit"),
+        grays,
+    )
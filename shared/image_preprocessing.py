@@ -0,0 +1,97 @@
+import threading
+import numpy as np
+import cv2
+
+IMG_SIZE = 128
+_INV_255 = np.float32(1.0 / 255.0)
+
+# One preprocessing path for both classifiers, used by training and serving:
+#   - resize with cv2 INTER_AREA (area averaging, the right filter for downscaling)
+#   - "unit" normalization: uint8 pixels / 255   (RGB waste photos, grayscale JPG/PNG)
+#   - "minmax" normalization: per-image (x - min) / (max - min)   (DICOM slices)
+# Output is always float32 written into a caller-supplied buffer; the only
+# other memory used is a small per-thread resize scratch buffer.
+
+_local = threading.local()
+
+
+def _scratch(shape, dtype):
+    buffers = getattr(_local, "buffers", None)
+    if buffers is None:
+        buffers = _local.buffers = {}
+    key = (shape, np.dtype(dtype).str)
+    buf = buffers.get(key)
+    if buf is None:
+        buf = buffers[key] = np.empty(shape, dtype=dtype)
+    return buf
+
+
+# === Decoding ===
+def decode_image_bytes(data, channels=3):
+    flag = cv2.IMREAD_COLOR if channels == 3 else cv2.IMREAD_GRAYSCALE
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag)
+    if image is None:
+        # Formats OpenCV cannot read (e.g. GIF) go through PIL
+        import io
+        from PIL import Image
+        image = np.asarray(Image.open(io.BytesIO(data)).convert("RGB" if channels == 3 else "L"))
+    elif channels == 3:
+        cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+    return image
+
+
+def read_dicom_pixels(file):
+    import pydicom
+    return pydicom.dcmread(file).pixel_array
+
+
+_CV_DTYPES = (np.uint8, np.uint16, np.int16, np.float32, np.float64)
+
+
+def _match_channels(image, channels):
+    if image.dtype not in _CV_DTYPES:
+        image = image.astype(np.float32)  # e.g. int32 DICOM pixel data, which OpenCV cannot resize
+    if channels == 3 and image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+    if channels == 1 and image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    return image
+
+
+# === Resize one image into a preallocated array of the same dtype ===
+def resize_into(image, out, interpolation=cv2.INTER_AREA):
+    return cv2.resize(image, (out.shape[1], out.shape[0]), dst=out, interpolation=interpolation)
+
+
+# === Batch resize + normalize into a float32 (N, size, size, channels) buffer ===
+# `mode` is "unit", "minmax" or one of those per image.
+def preprocess_batch(images, out=None, size=IMG_SIZE, channels=3, mode="unit"):
+    n = len(images)
+    if out is None:
+        out = np.empty((n, size, size, channels), dtype=np.float32)
+    if out.shape[0] < n or out.shape[1:] != (size, size, channels) or out.dtype != np.float32:
+        raise ValueError(f"Output buffer must be float32 with shape (>={n}, {size}, {size}, {channels})")
+
+    modes = [mode] * n if isinstance(mode, str) else list(mode)
+    resized_shape = (size, size, channels) if channels > 1 else (size, size)
+
+    for i, image in enumerate(images):
+        image = _match_channels(np.asarray(image), channels)
+        resized = resize_into(image, _scratch(resized_shape, image.dtype))
+        target = out[i] if channels > 1 else out[i, :, :, 0]
+
+        if modes[i] == "minmax":
+            # Range of the full-resolution image, as the DICOM path always used
+            lo, hi = float(image.min()), float(image.max())
+            np.subtract(resized, lo, out=target, dtype=np.float32, casting="unsafe")
+            np.multiply(target, np.float32(1.0 / (hi - lo) if hi > lo else 0.0), out=target)
+        elif modes[i] == "unit":
+            np.multiply(resized, _INV_255, out=target, dtype=np.float32, casting="unsafe")
+        else:
+            raise ValueError(f"Unknown normalization mode: {modes[i]}")
+    return out[:n]
+
+
+# Normalized float32 [0, 1] -> uint8, for previews and the uint8 stores
+def to_uint8(images):
+    return np.rint(np.multiply(images, 255.0, dtype=np.float32)).astype(np.uint8)
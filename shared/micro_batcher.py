@@ -0,0 +1,187 @@
+import time
+import queue
+import asyncio
+import threading
+from collections import Counter
+import numpy as np
+
+
+def _resolve(future, result=None, error=None):
+    if future.done():  # the request was cancelled while it waited
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+# run_batch for payloads that are sequences of inputs (an array of images, a
+# list of texts): one predict_fn call on all of them, results split back per
+# payload. A lone payload is passed through without a copy.
+def split_batches(predict_fn):
+    def run_batch(payloads):
+        if len(payloads) == 1:
+            inputs = payloads[0]
+        elif isinstance(payloads[0], np.ndarray):
+            inputs = np.concatenate(payloads)
+        else:
+            inputs = [x for payload in payloads for x in payload]
+        results = predict_fn(inputs)
+        split, offset = [], 0
+        for payload in payloads:
+            split.append(results[offset:offset + len(payload)])
+            offset += len(payload)
+        return split
+    return run_batch
+
+
+# === Dynamic micro-batching on one worker thread ===
+# Callers submit a payload with its size (e.g. number of images) and await a
+# future. The worker takes everything that arrived within `max_wait_ms` of the
+# first payload, up to `max_batch_size` in total (a larger payload runs on its
+# own and is never split), calls `run_batch(payloads)`, which returns one
+# result per payload, and resolves each future on its event loop. The event
+# loop never runs a batch itself.
+#   setup_fn:      runs on the worker thread before its first batch (load a
+#                  model, open a connection); if it raises, requests fail
+#   flush_on_stop: stop() runs what is still queued; otherwise queued requests
+#                  fail with RuntimeError("batcher stopped")
+# The worker starts on the first submit() if start() was not called.
+class MicroBatcher:
+    def __init__(self, run_batch, max_batch_size=16, max_wait_ms=5.0, setup_fn=None,
+                 flush_on_stop=False, name="micro-batcher"):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.setup_fn = setup_fn
+        self.flush_on_stop = flush_on_stop
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._carry = None  # item that did not fit in the previous batch
+        self._thread = None
+        self._running = False
+        self._start_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.error = None
+
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._batch_sizes = Counter()
+        self._busy_seconds = 0.0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._running = True
+            self.ready.clear()
+            self.error = None
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    # Requests still queued when the worker exits fail instead of hanging
+    def stop(self, timeout=10):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+        pending = [self._carry] if self._carry is not None else []
+        self._carry = None
+        while True:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for _, _, future, loop in pending:
+            loop.call_soon_threadsafe(_resolve, future, None, RuntimeError("batcher stopped"))
+
+    async def submit(self, payload, size=1):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((payload, size, future, loop))
+        self.start()
+        return await future
+
+    def _next_item(self, timeout):
+        if self._carry is not None:
+            item, self._carry = self._carry, None
+            return item
+        return self._queue.get(timeout=timeout)
+
+    def _collect(self):
+        try:
+            first = self._next_item(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        size = first[1]
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._next_item(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + item[1] > self.max_batch_size:
+                self._carry = item
+                break
+            batch.append(item)
+            size += item[1]
+        return batch
+
+    def _has_pending(self):
+        return self._carry is not None or not self._queue.empty()
+
+    def _run(self):
+        try:
+            if self.setup_fn is not None:
+                self.setup_fn()
+        except Exception as e:
+            self.error = e
+            print(f"❌ {self.name} setup failed: {e}", flush=True)
+        self.ready.set()
+
+        while self._running or (self.flush_on_stop and self._has_pending()):
+            batch = self._collect()
+            if not batch:
+                continue
+            if self.error is not None:
+                for _, _, future, loop in batch:
+                    loop.call_soon_threadsafe(_resolve, future, None, RuntimeError(f"{self.name} unavailable: {self.error}"))
+                continue
+
+            start = time.perf_counter()
+            size = sum(item_size for _, item_size, _, _ in batch)
+            try:
+                results = self.run_batch([payload for payload, _, _, _ in batch])
+                for (_, _, future, loop), result in zip(batch, results):
+                    loop.call_soon_threadsafe(_resolve, future, result)
+            except Exception as e:
+                for _, _, future, loop in batch:
+                    loop.call_soon_threadsafe(_resolve, future, None, e)
+
+            with self._lock:
+                self._batches += 1
+                self._items += size
+                self._batch_sizes[size] += 1
+                self._busy_seconds += time.perf_counter() - start
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "ready": self.ready.is_set() and self.error is None,
+                "queue_depth": self._queue.qsize() + (self._carry is not None),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "batch_size_histogram": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+                "busy_seconds": round(self._busy_seconds, 3),
+            }
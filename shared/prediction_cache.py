@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+# Hash a file in chunks so large .h5 models never have to fit in memory at once
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# === Prediction cache keyed by (hash of the raw upload, hash of the model file) ===
+# A bounded in-memory LRU answers repeat uploads without decoding or running the
+# CNN; an optional SQLite file keeps results across restarts. A background
+# thread re-checks the model file (os.stat) every `check_interval` seconds and
+# re-hashes it only when its mtime or size changes, so requests never hash the
+# model; a new hash drops every entry of the old model. While a re-hash runs,
+# lookups miss and nothing is stored.
+class PredictionCache:
+    def __init__(self, model_path, max_entries=1024, sqlite_path=None, check_interval=1.0):
+        self.model_path = model_path
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self.model_hash = None
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_stat = None
+        self._stale = False
+
+        self._db = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, model_hash TEXT NOT NULL, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.commit()
+
+        self._check_model()
+        self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    @staticmethod
+    def content_hash(data):
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self._check_model()
+            except OSError:
+                pass  # model file is being replaced; look again next time
+
+    # Hashes outside the lock, so lookups are never blocked behind a re-hash
+    def _check_model(self):
+        stat = os.stat(self.model_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._model_stat:
+            return
+
+        with self._lock:
+            self._stale = True
+        new_hash = file_hash(self.model_path)
+        with self._lock:
+            self._model_stat = signature
+            self._stale = False
+            if new_hash != self.model_hash:
+                self.model_hash = new_hash
+                self._entries.clear()
+                if self._db is not None:
+                    self._db.execute("DELETE FROM predictions WHERE model_hash != ?", (new_hash,))
+                    self._db.commit()
+
+    def _key(self, data):
+        return f"{self.content_hash(data)}:{self.model_hash}"
+
+    def get(self, data):
+        with self._lock:
+            if self._stale:
+                self.misses += 1
+                return None
+            key = self._key(data)
+
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM predictions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, data, value):
+        with self._lock:
+            if self._stale:
+                return
+            key = self._key(data)
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions (key, model_hash, value, created) VALUES (?, ?, ?, ?)",
+                    (key, self.model_hash, json.dumps(value), time.time())
+                )
+                self._db.commit()
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "model_hash": self.model_hash,
+            }
@@ -0,0 +1,91 @@
+import os
+import numpy as np
+
+# Model files produced by train.py and export_tflite.py
+MODEL_FILES = {
+    "keras": "waste_classifier.h5",
+    "tflite": "waste_classifier.tflite",
+    "tflite_int8": "waste_classifier_int8.tflite",
+}
+
+
+# === Full Keras model (the original .h5) ===
+class KerasEngine:
+    def __init__(self, model_path):
+        from tensorflow.keras.models import load_model
+        self.model_path = model_path
+        self.model = load_model(model_path)
+
+    def predict(self, batch):
+        return np.asarray(self.model.predict_on_batch(batch))
+
+
+def _interpreter_class():
+    # Prefer the standalone runtimes; fall back to the one bundled with TensorFlow
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+# === TFLite model (float32 or int8-quantized), float32 in / probabilities out ===
+# Not thread-safe: the batcher calls predict() from a single worker thread.
+class TFLiteEngine:
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self.interpreter = _interpreter_class()(model_path=model_path, num_threads=num_threads or os.cpu_count())
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.batch_size = int(self.input["shape"][0])
+
+    def _resize(self, batch_size):
+        self.interpreter.resize_tensor_input(self.input["index"], [batch_size, *self.input["shape"][1:]])
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self.batch_size = batch_size
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        if len(batch) != self.batch_size:
+            self._resize(len(batch))
+
+        scale, zero_point = self.input["quantization"]
+        if self.input["dtype"] != np.float32 and scale:
+            info = np.iinfo(self.input["dtype"])
+            batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(self.input["dtype"])
+
+        self.interpreter.set_tensor(self.input["index"], batch)
+        self.interpreter.invoke()
+        preds = self.interpreter.get_tensor(self.output["index"])
+
+        scale, zero_point = self.output["quantization"]
+        if self.output["dtype"] != np.float32 and scale:
+            preds = (preds.astype(np.float32) - zero_point) * scale
+        return preds
+
+
+# Import the runtime an engine needs (TensorFlow or a TFLite interpreter) so the
+# caller can time the import separately from the model load
+def import_runtime(kind):
+    if kind == "keras":
+        import tensorflow.keras.models  # noqa: F401
+    else:
+        _interpreter_class()
+
+
+# === Pick the inference engine at startup ===
+def load_engine(kind, model_dir="model", num_threads=None):
+    if kind not in MODEL_FILES:
+        raise ValueError(f"Unknown MODEL_ENGINE '{kind}', expected one of {sorted(MODEL_FILES)}")
+
+    model_path = os.path.join(model_dir, MODEL_FILES[kind])
+    if kind == "keras":
+        return KerasEngine(model_path)
+    return TFLiteEngine(model_path, num_threads=num_threads)
@@ -1,9 +1,25 @@
-from fastapi import FastAPI, File, UploadFile
+from fastapi import FastAPI, File, UploadFile, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from tensorflow.keras.models import load_model
-from PIL import Image
+from fastapi.responses import JSONResponse, StreamingResponse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 import numpy as np
 import io
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+import zipfile
+
+# Add the repository root to system path for the shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared.prediction_cache import PredictionCache
+from shared.image_preprocessing import decode_image_bytes, preprocess_batch
+from shared.micro_batcher import MicroBatcher, split_batches
+from engines import import_runtime, load_engine
 
 # FastAPI app
 app = FastAPI()
@@ -17,29 +33,208 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load model
-model = load_model("model/waste_classifier.h5")
+# Model settings: MODEL_ENGINE picks keras (.h5), tflite or tflite_int8 (see export_tflite.py)
+MODEL_ENGINE = os.getenv("MODEL_ENGINE", "keras")
+TFLITE_THREADS = int(os.getenv("TFLITE_THREADS", "0")) or None
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", "5"))
+
+# Filled in by the background loader; health checks are served before it finishes
+engine = None
+prediction_cache = None
+batcher = None
+model_state = {"ready": False, "error": None, "engine": MODEL_ENGINE, "import_seconds": None, "load_seconds": None}
+
+def load_model_in_background():
+    global engine, prediction_cache, batcher
+    try:
+        start = time.perf_counter()
+        import_runtime(MODEL_ENGINE)
+        model_state["import_seconds"] = round(time.perf_counter() - start, 3)
+        print(f"⏱️ {MODEL_ENGINE} runtime imported in {model_state['import_seconds']}s", flush=True)
+
+        start = time.perf_counter()
+        engine = load_engine(MODEL_ENGINE, "model", num_threads=TFLITE_THREADS)
+        engine.predict(np.zeros((1, 128, 128, 3), dtype=np.float32))  # warm-up
+
+        # Prediction cache: repeat uploads skip decoding and the CNN.
+        # Set PREDICTION_CACHE_DB to also keep results in SQLite across restarts.
+        prediction_cache = PredictionCache(engine.model_path, max_entries=4096,
+                                           sqlite_path=os.getenv("PREDICTION_CACHE_DB"))
+
+        # Micro-batcher: concurrent /predict/ requests share one batched forward pass
+        batcher = MicroBatcher(
+            split_batches(lambda images: np.asarray(engine.predict(images))),
+            max_batch_size=int(os.getenv("BATCH_MAX_SIZE", "16")),
+            max_wait_ms=float(os.getenv("BATCH_MAX_WAIT_MS", "5")),
+            name="image-batcher",
+        )
+        batcher.start()
+
+        model_state["load_seconds"] = round(time.perf_counter() - start, 3)
+        model_state["ready"] = True
+        print(f"✅ Model {engine.model_path} loaded and warmed up in {model_state['load_seconds']}s", flush=True)
+    except Exception as e:
+        model_state["error"] = str(e)
+        print(f"❌ Model failed to load: {e}", flush=True)
+
+@app.on_event("startup")
+def start_model_loader():
+    threading.Thread(target=load_model_in_background, name="model-loader", daemon=True).start()
+
+@app.on_event("shutdown")
+def stop_batcher():
+    if batcher is not None:
+        batcher.stop()
+
+# Prediction routes answer 503 + Retry-After until the model is ready,
+# before the upload body is even read
+@app.middleware("http")
+async def reject_until_ready(request: Request, call_next):
+    if request.url.path.startswith("/predict") and not model_state["ready"]:
+        detail = f"Model failed to load: {model_state['error']}" if model_state["error"] else "Model is still loading."
+        return JSONResponse({"detail": detail}, status_code=503,
+                            headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+    return await call_next(request)
+
+# Liveness: the process is up and serving
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+# Readiness: the model is loaded and warmed up
+@app.get("/readyz")
+def readyz():
+    status_code = 200 if model_state["ready"] else 503
+    return JSONResponse(model_state, status_code=status_code)
+
+# Bulk uploads: images are decoded in this pool and classified in fixed-size batches
+PREDICT_BATCH_SIZE = int(os.getenv("PREDICT_BATCH_SIZE", "32"))
+decode_pool = ThreadPoolExecutor(max_workers=int(os.getenv("DECODE_WORKERS", "4")))
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
 
 # Load class names
 with open("model/class_names.txt", "r") as f:
     class_names = [line.strip() for line in f.readlines()]
 
-# Image preprocessing
-def preprocess_image(image_bytes):
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB").resize((128, 128))
-    img = np.array(img) / 255.0
-    return np.expand_dims(img, axis=0)
+# Image preprocessing, shared with training (shared/image_preprocessing.py).
+# Pass `out` to write straight into a row of a preallocated batch.
+def preprocess_image(image_bytes, out=None):
+    return preprocess_batch([decode_image_bytes(image_bytes)], out=out)
 
 # API route
 @app.post("/predict/")
 async def predict(file: UploadFile = File(...)):
     image_bytes = await file.read()
-    img = preprocess_image(image_bytes)
-    preds = model.predict(img)[0]
+    # Cache lookups hash the upload and may hit SQLite, so they run off the event loop too
+    cached = await run_in_threadpool(prediction_cache.get, image_bytes)
+    if cached is not None:
+        return cached
+
+    # Decode off the event loop, then wait for a slot in the next batch
+    img = await run_in_threadpool(preprocess_image, image_bytes)
+    preds = (await batcher.submit(img, len(img)))[0]
     pred_index = int(np.argmax(preds))
     confidence = float(preds[pred_index])
 
-    return {
+    result = {
         "class": class_names[pred_index],
         "confidence": round(confidence * 100, 2)
     }
+    await run_in_threadpool(prediction_cache.put, image_bytes, result)
+    return result
+
+# Cache statistics
+@app.get("/cache_stats/")
+def cache_stats():
+    return prediction_cache.stats() if prediction_cache is not None else {}
+
+# Batching metrics: queue depth and batch sizes
+@app.get("/metrics/")
+def metrics():
+    return batcher.metrics() if batcher is not None else {}
+
+# Runs on the decode pool: cache lookup first, decoding only on a miss.
+# Returns the cached result, or None once the image is decoded into `out`.
+def lookup_or_decode(data, out):
+    cached = prediction_cache.get(data)
+    if cached is None:
+        preprocess_image(data, out)
+    return cached
+
+def store_results(pairs):
+    for data, result in pairs:
+        prediction_cache.put(data, result)
+
+# Expand uploads into (name, bytes) pairs; zip archives contribute every image inside
+def expand_uploads(uploads):
+    items = []
+    for name, data in uploads:
+        if name.lower().endswith(".zip") or zipfile.is_zipfile(io.BytesIO(data)):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for member in sorted(archive.namelist()):
+                    if member.lower().endswith(IMAGE_EXTENSIONS) and not member.startswith("__MACOSX/"):
+                        items.append((member, archive.read(member)))
+        else:
+            items.append((name, data))
+    return items
+
+def _ndjson(record):
+    return json.dumps(record) + "\n"
+
+async def classify_stream(items):
+    loop = asyncio.get_running_loop()
+    chunks = [items[i:i + PREDICT_BATCH_SIZE] for i in range(0, len(items), PREDICT_BATCH_SIZE)]
+
+    # Two input buffers reused for the whole request: the next chunk is
+    # decoded into one while the current chunk is classified from the other
+    buffers = [np.empty((PREDICT_BATCH_SIZE, 128, 128, 3), dtype=np.float32) for _ in range(min(2, len(chunks)))]
+
+    def start_decoding(chunk_index):
+        if chunk_index >= len(chunks):
+            return []
+        buffer = buffers[chunk_index % 2]
+        # Cache hits skip decoding entirely
+        return [loop.run_in_executor(decode_pool, lookup_or_decode, data, buffer[offset:offset + 1])
+                for offset, (_, data) in enumerate(chunks[chunk_index])]
+
+    pending = start_decoding(0)
+    for chunk_index, chunk in enumerate(chunks):
+        jobs, pending = pending, start_decoding(chunk_index + 1)
+        outcomes = await asyncio.gather(*jobs, return_exceptions=True)
+
+        rows, slots = [], []
+        for offset, ((name, data), outcome) in enumerate(zip(chunk, outcomes)):
+            index = chunk_index * PREDICT_BATCH_SIZE + offset
+            if isinstance(outcome, Exception):
+                yield _ndjson({"index": index, "file": name, "error": f"Could not decode image: {outcome}"})
+                continue
+            if outcome is not None:
+                yield _ndjson({"index": index, "file": name, **outcome})
+                continue
+            rows.append(offset)
+            slots.append((index, name, data))
+
+        if not rows:
+            continue
+
+        # Rows 0..k-1 are passed as a view; gaps left by errors or cache hits need one gather
+        buffer = buffers[chunk_index % 2]
+        batch = buffer[:len(rows)] if rows[-1] == len(rows) - 1 else buffer[rows]
+        preds = await batcher.submit(batch, len(batch))
+        results = []
+        for (index, name, data), pred in zip(slots, preds):
+            pred_index = int(np.argmax(pred))
+            results.append((data, {
+                "class": class_names[pred_index],
+                "confidence": round(float(pred[pred_index]) * 100, 2)
+            }))
+        await run_in_threadpool(store_results, results)
+        for (index, name, _), (_, result) in zip(slots, results):
+            yield _ndjson({"index": index, "file": name, **result})
+
+# Bulk route: multipart images and/or zip archives in, NDJSON results streamed out
+@app.post("/predict_batch/")
+async def predict_batch(files: List[UploadFile] = File(...)):
+    uploads = [(file.filename or f"upload_{i}", await file.read()) for i, file in enumerate(files)]
+    items = await run_in_threadpool(expand_uploads, uploads)
+    return StreamingResponse(classify_stream(items), media_type="application/x-ndjson")
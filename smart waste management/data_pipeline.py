@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+import hashlib
+import numpy as np
+import tensorflow as tf
+
+# Add the repository root to system path for the shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.image_preprocessing import decode_image_bytes, resize_into
+
+IMG_SIZE = 128
+VALIDATION_SPLIT = 0.2
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif")
+AUTOTUNE = tf.data.AUTOTUNE
+PREPROCESSING_VERSION = 2  # bump when decode/resize changes so disk caches are rebuilt
+
+
+# === Class folders, sorted the same way flow_from_directory orders them ===
+def list_classes(dataset_path):
+    return sorted(d for d in os.listdir(dataset_path) if os.path.isdir(os.path.join(dataset_path, d)))
+
+
+# Per-class split like flow_from_directory: the first 20% of each sorted class
+# folder is the validation (held-out) part, the rest is training
+def split_files(dataset_path, class_names, validation_split=VALIDATION_SPLIT):
+    train, val = [], []
+    for label, class_name in enumerate(class_names):
+        class_dir = os.path.join(dataset_path, class_name)
+        files = sorted(f for f in os.listdir(class_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+        n_val = int(validation_split * len(files))
+        val += [(os.path.join(class_dir, f), label) for f in files[:n_val]]
+        train += [(os.path.join(class_dir, f), label) for f in files[n_val:]]
+    return train, val
+
+
+# Decode + resize with the same code the backend serves with
+# (shared/image_preprocessing.py); OpenCV releases the GIL, so the parallel
+# map still decodes on several cores
+def _decode_shared(path):
+    with open(path.decode(), "rb") as f:
+        image = decode_image_bytes(f.read())
+    return resize_into(image, np.empty((IMG_SIZE, IMG_SIZE, 3), dtype=np.uint8))
+
+
+# === Decode + resize one file to a 128x128x3 uint8 tensor ===
+def decode_and_resize(path, label):
+    image = tf.numpy_function(_decode_shared, [path], tf.uint8)
+    image.set_shape([IMG_SIZE, IMG_SIZE, 3])
+    return image, label
+
+
+# Same augmentation as the old ImageDataGenerator, applied to whole batches
+def make_augmentation(seed=None):
+    return tf.keras.Sequential([
+        tf.keras.layers.RandomRotation(20 / 360, seed=seed),
+        tf.keras.layers.RandomZoom(0.2, seed=seed),
+        tf.keras.layers.RandomFlip("horizontal", seed=seed),
+    ])
+
+
+# Cache files are named after the file list, so adding or editing images
+# never reuses a stale cache
+def cache_path_for(samples, cache_dir, name):
+    digest = hashlib.md5(f"v{PREPROCESSING_VERSION}\n".encode())
+    for path, label in samples:
+        stat = os.stat(path)
+        digest.update(f"{path}|{label}|{stat.st_mtime_ns}|{stat.st_size}\n".encode())
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, f"{name}-{digest.hexdigest()[:12]}")
+
+
+# Batches of uint8 images -> normalized float32 images + one-hot labels,
+# augmented when training, prefetched
+def prepare_batches(ds, num_classes, training, seed=None):
+    def to_model_input(images, labels):
+        return tf.cast(images, tf.float32) / 255.0, tf.one_hot(labels, num_classes)
+
+    ds = ds.map(to_model_input, num_parallel_calls=AUTOTUNE)
+    if training:
+        augment = make_augmentation(seed)
+        ds = ds.map(lambda x, y: (augment(x, training=True), y), num_parallel_calls=AUTOTUNE)
+    return ds.prefetch(AUTOTUNE)
+
+
+def finish_batches(ds, num_classes, batch_size, training, shuffle_buffer=1000, seed=None):
+    if training:
+        ds = ds.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return prepare_batches(ds.batch(batch_size), num_classes, training, seed=seed)
+
+
+# === tf.data pipeline: parallel decode -> cache to disk -> shuffle/batch/augment -> prefetch ===
+def make_dataset(samples, num_classes, batch_size, training, cache_dir=None, name="data", seed=None):
+    paths = [path for path, _ in samples]
+    labels = [label for _, label in samples]
+
+    ds = tf.data.Dataset.from_tensor_slices((paths, labels))
+    ds = ds.map(decode_and_resize, num_parallel_calls=AUTOTUNE, deterministic=not training)
+    if cache_dir:
+        ds = ds.cache(cache_path_for(samples, cache_dir, name))
+    return finish_batches(ds, num_classes, batch_size, training, seed=seed)
+
+
+# === tf.data pipeline over packed shards (see shards.py): no JPEG decode at all ===
+# Only indices are shuffled, so every epoch gets a full shuffle for free
+def make_shard_dataset(reader, indices, batch_size, training, seed=None):
+    indices = np.asarray(indices, dtype=np.int64)
+    labels = reader.labels
+
+    def load_batch(batch_indices):
+        return reader.gather(batch_indices), labels[batch_indices]
+
+    ds = tf.data.Dataset.from_tensor_slices(indices)
+    if training:
+        ds = ds.shuffle(len(indices), seed=seed, reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size)
+
+    def read(batch_indices):
+        images, batch_labels = tf.numpy_function(load_batch, [batch_indices], (tf.uint8, tf.int64))
+        images.set_shape([None, IMG_SIZE, IMG_SIZE, 3])
+        batch_labels.set_shape([None])
+        return images, batch_labels
+
+    ds = ds.map(read, num_parallel_calls=AUTOTUNE, deterministic=not training)
+    return prepare_batches(ds, len(reader.class_names), training, seed=seed)
+
+
+# === Logs images/sec for every epoch so throughput regressions are visible ===
+class ThroughputLogger(tf.keras.callbacks.Callback):
+    def __init__(self, num_images):
+        super().__init__()
+        self.num_images = num_images
+        self.start = None
+        self.train_end = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.start = time.perf_counter()
+        self.train_end = self.start
+
+    # The validation pass runs after the last training batch, so stopping the
+    # clock here leaves it out (input-pipeline waits between batches stay in)
+    def on_train_batch_end(self, batch, logs=None):
+        self.train_end = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = self.train_end - self.start
+        images_per_sec = self.num_images / elapsed
+        if logs is not None:
+            logs["images_per_sec"] = images_per_sec
+        print(f"⚡ Epoch {epoch + 1}: {images_per_sec:.1f} images/sec ({elapsed:.1f}s)")
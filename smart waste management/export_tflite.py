@@ -0,0 +1,139 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+import tensorflow as tf
+from data_pipeline import split_files
+
+# Add the repository root to system path for the shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.image_preprocessing import decode_image_bytes, preprocess_batch
+
+# Paths (run after train.py, from the same folder)
+DATASET_PATH = r"D:\smart waste management\archive (1)\TrashType_Image_Dataset"
+MODEL_PATH = "model/waste_classifier.h5"
+FLOAT_TFLITE_PATH = "model/waste_classifier.tflite"
+INT8_TFLITE_PATH = "model/waste_classifier_int8.tflite"
+REPORT_PATH = "model/export_report.json"
+IMG_SIZE = 128
+QUANTIZE_INT8 = True       # also export an int8 post-training-quantized model
+CALIBRATION_SAMPLES = 200  # training images used to calibrate int8 ranges
+EVAL_SAMPLES = 500         # validation images used for the comparison report
+SEED = 42
+
+
+# Same preprocessing as the backend: RGB, 128x128, scaled to [0, 1]
+def load_images(samples):
+    images = np.empty((len(samples), IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
+    for i, (path, _) in enumerate(samples):
+        with open(path, "rb") as f:
+            preprocess_batch([decode_image_bytes(f.read())], out=images[i:i + 1])
+    labels = np.array([label for _, label in samples])
+    return images, labels
+
+
+def sample(samples, n, rng):
+    if len(samples) <= n:
+        return samples
+    return [samples[i] for i in sorted(rng.choice(len(samples), size=n, replace=False))]
+
+
+def export_float(model):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    return converter.convert()
+
+
+def export_int8(model, calibration_images):
+    def representative_dataset():
+        for image in calibration_images:
+            yield [image[np.newaxis]]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    return converter.convert()
+
+
+# Accuracy plus single-image latency and batched throughput for one engine
+def evaluate(predict, images, labels, batch_size=32):
+    predict(images[:1])  # warm-up
+
+    latencies = []
+    for image in images[:100]:
+        start = time.perf_counter()
+        predict(image[np.newaxis])
+        latencies.append(time.perf_counter() - start)
+
+    preds = []
+    start = time.perf_counter()
+    for i in range(0, len(images), batch_size):
+        preds.append(predict(images[i:i + batch_size]))
+    elapsed = time.perf_counter() - start
+    preds = np.concatenate(preds)
+
+    return {
+        "accuracy": round(float(np.mean(preds.argmax(axis=1) == labels)), 4),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)) * 1000, 3),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)) * 1000, 3),
+        "throughput_images_per_s": round(len(images) / elapsed, 1),
+    }
+
+
+if __name__ == "__main__":
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+    from engines import KerasEngine, TFLiteEngine
+
+    with open("model/class_names.txt", "r") as f:
+        class_names = [line.strip() for line in f.readlines()]
+
+    rng = np.random.default_rng(SEED)
+    # Same split as train.py. There is no separate test split, and train.py picks
+    # its checkpoint on this validation set, so the absolute accuracies are
+    # optimistic; the float32 vs int8 deltas are the meaningful comparison.
+    train_files, val_files = split_files(DATASET_PATH, class_names)
+    eval_images, eval_labels = load_images(sample(val_files, EVAL_SAMPLES, rng))
+    print(f"🧪 Validation set: {len(eval_labels)} images (also used for checkpoint selection)")
+
+    keras_engine = KerasEngine(MODEL_PATH)
+
+    # Float32 TFLite
+    with open(FLOAT_TFLITE_PATH, "wb") as f:
+        f.write(export_float(keras_engine.model))
+    print(f"✅ Saved {FLOAT_TFLITE_PATH}")
+
+    # Int8 post-training quantization, calibrated on training images
+    if QUANTIZE_INT8:
+        calibration_images, _ = load_images(sample(train_files, CALIBRATION_SAMPLES, rng))
+        with open(INT8_TFLITE_PATH, "wb") as f:
+            f.write(export_int8(keras_engine.model, calibration_images))
+        print(f"✅ Saved {INT8_TFLITE_PATH}")
+
+    # Accuracy / latency comparison against the .h5 model
+    engines = {"keras": (MODEL_PATH, keras_engine), "tflite": (FLOAT_TFLITE_PATH, TFLiteEngine(FLOAT_TFLITE_PATH))}
+    if QUANTIZE_INT8:
+        engines["tflite_int8"] = (INT8_TFLITE_PATH, TFLiteEngine(INT8_TFLITE_PATH))
+
+    report = {
+        "eval_split": "validation (used by train.py for checkpoint selection; accuracy is optimistic)",
+        "validation_images": int(len(eval_labels)),
+        "engines": {},
+    }
+    for name, (path, engine) in engines.items():
+        result = evaluate(engine.predict, eval_images, eval_labels)
+        result["size_mb"] = round(os.path.getsize(path) / 1e6, 2)
+        report["engines"][name] = result
+
+    baseline = report["engines"]["keras"]
+    print(f"\n{'engine':<12} {'val acc':>7} {'Δacc':>7} {'p50 ms':>8} {'p95 ms':>8} {'img/s':>8} {'MB':>6}")
+    for name, r in report["engines"].items():
+        r["accuracy_delta"] = round(r["accuracy"] - baseline["accuracy"], 4)
+        print(f"{name:<12} {r['accuracy']:>7.4f} {r['accuracy_delta']:>+7.4f} {r['latency_ms_p50']:>8.2f} "
+              f"{r['latency_ms_p95']:>8.2f} {r['throughput_images_per_s']:>8.1f} {r['size_mb']:>6.2f}")
+
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📝 Report saved to {REPORT_PATH}")
@@ -3,18 +3,42 @@ import requests
 from PIL import Image
 from io import BytesIO
 from datetime import datetime
+import math
+import os
 import folium
+from folium.plugins import FastMarkerCluster, HeatMap
 from streamlit_folium import st_folium
+from detection_store import DetectionStore, cell_size, viewport_around
+from backend_client import BackendClient
+
+# ---------------- Map Settings ----------------
+DETECTIONS_DB = os.getenv("DETECTIONS_DB", "detections.sqlite3")
+MAX_MARKERS = 500          # more detections than this in view -> aggregated grid cells
+MAP_WIDTH, MAP_HEIGHT = 700, 500
+
+# Detections live in SQLite, shared by all sessions and kept across restarts
+@st.cache_resource
+def get_store(db_path):
+    return DetectionStore(db_path)
+
+# One pooled HTTP client (keep-alive, timeouts, retries) shared by all sessions
+@st.cache_resource
+def get_client():
+    return BackendClient()
 
 # ---------------- Session Initialization ----------------
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
-if "detections" not in st.session_state:
-    st.session_state.detections = []
+if "map_view" not in st.session_state:
+    st.session_state.map_view = None
+if "map_seen" not in st.session_state:
+    st.session_state.map_seen = None
 if "last_result" not in st.session_state:
     st.session_state.last_result = None
 if "last_image" not in st.session_state:
     st.session_state.last_image = None
+if "last_batch" not in st.session_state:
+    st.session_state.last_batch = None
 
 # ---------------- Dummy User Data ----------------
 USERS = {"admin": "admin123", "user": "pass123"}
@@ -46,7 +70,12 @@ def main_app():
     st.title("♻️ Smart Waste Classifier")
     st.markdown("Upload a waste image and input the location to classify and map.")
 
-    uploaded_file = st.file_uploader("📤 Upload Waste Image", type=["jpg", "png", "jpeg"])
+    mode = st.radio("Upload mode", ["Single image", "Multiple images"], horizontal=True)
+    if mode == "Single image":
+        uploaded_file = st.file_uploader("📤 Upload Waste Image", type=["jpg", "png", "jpeg"])
+    else:
+        uploaded_files = st.file_uploader("📤 Upload Waste Images", type=["jpg", "png", "jpeg"],
+                                          accept_multiple_files=True)
 
     col1, col2 = st.columns(2)
     with col1:
@@ -54,35 +83,17 @@ def main_app():
     with col2:
         lon = st.number_input("Longitude", format="%.6f")
 
-    if st.button("Classify") and uploaded_file:
-        try:
-            files = {"file": uploaded_file.getvalue()}
-            response = requests.post("http://localhost:8000/predict/", files=files)
-
-            if response.status_code == 200:
-                result = response.json()
-                pred_class = result['class']
-                confidence = result['confidence']
-
-                # Store result in session
-                st.session_state.last_result = {
-                    "class": pred_class,
-                    "confidence": confidence,
-                    "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "latitude": lat,
-                    "longitude": lon
-                }
-                st.session_state.last_image = uploaded_file.getvalue()
-
-                st.session_state.detections.append(st.session_state.last_result)
-
-            else:
-                st.error("❌ Backend prediction failed. Check FastAPI.")
-        except Exception as e:
-            st.error(f"🚨 Error: {e}")
+    if st.button("Classify"):
+        if mode == "Single image" and uploaded_file:
+            classify_one(uploaded_file, lat, lon)
+        elif mode == "Multiple images" and uploaded_files:
+            classify_many(uploaded_files, lat, lon)
 
     # ---------------- Show Persistent Prediction ----------------
-    if st.session_state.last_result:
+    if st.session_state.last_batch:
+        st.success(f"🧠 Classified {len(st.session_state.last_batch)} images")
+        st.dataframe(st.session_state.last_batch, use_container_width=True)
+    elif st.session_state.last_result:
         res = st.session_state.last_result
         st.success(f"🧠 Predicted: **{res['class'].upper()}** with {res['confidence']:.2f}% confidence")
         st.caption(f"📍 Location: ({res['latitude']}, {res['longitude']}) at {res['time']}")
@@ -90,22 +101,155 @@ def main_app():
             st.image(Image.open(BytesIO(st.session_state.last_image)), caption="🖼️ Uploaded Image", use_column_width=True)
 
     # ---------------- Waste Map ----------------
-    if st.session_state.detections:
+    store = get_store(DETECTIONS_DB)
+    latest_detection = store.latest()
+    if latest_detection:
         st.subheader("🗺️ Waste Detection Map")
-        # Use the most recent detection to center the map
-        latest_detection = st.session_state.detections[-1]
-        map_obj = folium.Map(location=[latest_detection['latitude'], latest_detection['longitude']], zoom_start=13)
+        map_style = st.radio("Map view", ["Clusters", "Heatmap"], horizontal=True)
+
+        sync_map_view()
+        if st.session_state.map_view is None:
+            # Use the most recent detection to center the map
+            center = [latest_detection['latitude'], latest_detection['longitude']]
+            st.session_state.map_view = {
+                "center": center,
+                "zoom": 13,
+                "bounds": viewport_around(center[0], center[1], 13, MAP_WIDTH, MAP_HEIGHT),
+            }
+        view = st.session_state.map_view
+
+        # Only the detections inside the current viewport are queried and drawn
+        layer, in_view = build_detection_layer(store, view["bounds"], map_style)
+        st.caption(f"📍 {in_view} detections in view · {store.count()} total")
+
+        map_obj = folium.Map(location=view["center"], zoom_start=view["zoom"])
+        st_folium(
+            map_obj, feature_group_to_add=layer, center=view["center"], zoom=view["zoom"],
+            key="waste_map", width=MAP_WIDTH, height=MAP_HEIGHT,
+            returned_objects=["bounds", "center", "zoom"],
+        )
+
+# ---------------- Classification Helpers ----------------
+def make_detection(result, lat, lon):
+    return {
+        "class": result['class'],
+        "confidence": result['confidence'],
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "latitude": lat,
+        "longitude": lon
+    }
+
+def classify_one(uploaded_file, lat, lon):
+    try:
+        result = get_client().predict(uploaded_file.getvalue(), uploaded_file.name)
+    except requests.ReadTimeout:
+        st.error("⏱️ Backend timed out. Is FastAPI overloaded?")
+        return
+    except requests.ConnectionError:
+        st.error("🔌 Cannot reach the backend. Is FastAPI running?")
+        return
+    except requests.HTTPError:
+        st.error("❌ Backend prediction failed. Check FastAPI.")
+        return
+    except Exception as e:
+        st.error(f"🚨 Error: {e}")
+        return
+
+    # Store result in session
+    st.session_state.last_result = make_detection(result, lat, lon)
+    st.session_state.last_image = uploaded_file.getvalue()
+    st.session_state.last_batch = None
+
+    get_store(DETECTIONS_DB).add(st.session_state.last_result)
+    st.session_state.map_view = None  # re-center the map on the new detection
+
+# Images are sent concurrently over the pooled client; each result is shown
+# (and saved) as soon as it comes back
+def classify_many(uploaded_files, lat, lon):
+    uploads = [(f.name, f.getvalue()) for f in uploaded_files]
+    progress = st.progress(0.0, text=f"Classifying {len(uploads)} images...")
+    live = st.empty()
+    rows = []
+
+    with live.container():
+        for done, (i, name, result, error) in enumerate(get_client().predict_many(uploads), start=1):
+            progress.progress(done / len(uploads), text=f"Classified {done}/{len(uploads)} images")
+            if error is not None:
+                st.error(f"❌ {name}: {error}")
+                rows.append({"file": name, "class": "error", "confidence": None, "error": str(error)})
+                continue
+
+            detection = make_detection(result, lat, lon)
+            get_store(DETECTIONS_DB).add(detection)
+            st.write(f"🧠 **{name}** → {result['class'].upper()} ({result['confidence']:.2f}%)")
+            rows.append({"file": name, "class": result['class'], "confidence": result['confidence'], "error": None})
+
+    progress.empty()
+    live.empty()
+    st.session_state.last_batch = sorted(rows, key=lambda row: row["file"])
+    st.session_state.last_result = None
+    st.session_state.last_image = None
+    st.session_state.map_view = None
+
+# ---------------- Map Helpers ----------------
+# Follow the user's pan/zoom: st_folium keeps the last reported viewport in session state
+def sync_map_view():
+    state = st.session_state.get("waste_map")
+    if not state or not state.get("bounds") or state == st.session_state.map_seen:
+        return
+    st.session_state.map_seen = state
+
+    south_west, north_east = state["bounds"]["_southWest"], state["bounds"]["_northEast"]
+    if south_west.get("lat") is None or state.get("center") is None:
+        return
+    st.session_state.map_view = {
+        "center": [state["center"]["lat"], state["center"]["lng"]],
+        "zoom": state["zoom"],
+        "bounds": (south_west["lat"], south_west["lng"], north_east["lat"], north_east["lng"]),
+    }
 
+# Markers are built in the browser from one compact data list instead of one
+# folium object per detection
+MARKER_CALLBACK = """
+function (row) {
+    var icon = L.AwesomeMarkers.icon({icon: "trash", prefix: "fa", markerColor: "green"});
+    return L.marker(new L.LatLng(row[0], row[1]), {icon: icon}).bindPopup(row[2]);
+}
+"""
 
-        for det in st.session_state.detections:
-            popup_text = f"{det['class'].title()} ({det['confidence']:.2f}%)<br>{det['time']}"
-            folium.Marker(
-                location=[det['latitude'], det['longitude']],
-                popup=popup_text,
-                icon=folium.Icon(color="green", icon="trash", prefix="fa")
-            ).add_to(map_obj)
+def build_detection_layer(store, bounds, map_style):
+    layer = folium.FeatureGroup(name="Detections")
+    in_view = store.count(bounds)
 
-        st_folium(map_obj, width=700, height=500)
+    if map_style == "Heatmap":
+        cells = store.aggregate(bounds, cell_size(bounds, cells=64))
+        peak = max((cell["count"] for cell in cells), default=1)
+        HeatMap([[cell["latitude"], cell["longitude"], cell["count"] / peak] for cell in cells],
+                radius=18).add_to(layer)
+    elif in_view <= MAX_MARKERS:
+        rows = [
+            [det['latitude'], det['longitude'], f"{det['class'].title()} ({det['confidence']:.2f}%)<br>{det['time']}"]
+            for det in store.query(bounds, limit=MAX_MARKERS)
+        ]
+        FastMarkerCluster(rows, callback=MARKER_CALLBACK).add_to(layer)
+    else:
+        # Too many for individual markers: one counted circle per grid cell, aggregated in SQLite
+        cells = store.aggregate(bounds, cell_size(bounds, cells=24))
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [cell["longitude"], cell["latitude"]]},
+                "properties": {"count": cell["count"], "radius": 6 + 4 * math.log10(cell["count"])},
+            }
+            for cell in cells
+        ]
+        folium.GeoJson(
+            {"type": "FeatureCollection", "features": features},
+            marker=folium.CircleMarker(color="green", fill=True, fill_opacity=0.6),
+            style_function=lambda feature: {"radius": feature["properties"]["radius"]},
+            tooltip=folium.GeoJsonTooltip(fields=["count"], aliases=["Detections"]),
+        ).add_to(layer)
+    return layer, in_view
 
 # ---------------- Streamlit Control Flow ----------------
 if not st.session_state.logged_in:
@@ -0,0 +1,92 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Backend settings; the timeouts are (connect, read) in seconds
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("BACKEND_READ_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("BACKEND_MAX_RETRIES", "3"))
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "4"))
+
+
+# === HTTP client for the FastAPI backend ===
+# One keep-alive connection pool shared by every Streamlit session. Connection
+# errors and 502/503/504 are retried with exponential backoff (0.5s, 1s, 2s...),
+# and a 503 Retry-After from the backend while the model loads is honoured.
+# /predict/ has no side effects, so retrying the POST on those is safe.
+# A read timeout is never retried: the request already reached the backend, and
+# re-sending it would hold the session for up to (retries + 1) * read timeout.
+# It surfaces as requests.ReadTimeout.
+class BackendClient:
+    def __init__(self, base_url=BACKEND_URL, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 retries=MAX_RETRIES, backoff=0.5, pool_size=UPLOAD_WORKERS):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        retry = Retry(
+            total=retries,
+            read=False,  # re-raise read errors as-is instead of retrying them
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=("GET", "POST"),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def predict(self, image_bytes, filename="image.jpg"):
+        response = self.session.post(
+            f"{self.base_url}/predict/",
+            files={"file": (filename, image_bytes)},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    # Classify several images concurrently; yields (index, filename, result, error)
+    # in completion order so the caller can show each result as soon as it arrives
+    def predict_many(self, uploads, max_workers=None):
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as pool:
+            futures = {
+                pool.submit(self.predict, data, name): (i, name)
+                for i, (name, data) in enumerate(uploads)
+            }
+            for future in as_completed(futures):
+                i, name = futures[future]
+                try:
+                    yield i, name, future.result(), None
+                except Exception as e:
+                    yield i, name, None, e
+
+    def ready(self):
+        try:
+            return self.session.get(f"{self.base_url}/readyz", timeout=self.timeout).status_code == 200
+        except requests.RequestException:
+            return False
+
+    def close(self):
+        self.session.close()
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # Demo: python backend_client.py img1.jpg img2.jpg ...  (backend must be running)
+    client = BackendClient()
+    uploads = []
+    for path in sys.argv[1:]:
+        with open(path, "rb") as f:
+            uploads.append((os.path.basename(path), f.read()))
+
+    start = time.perf_counter()
+    for i, name, result, error in client.predict_many(uploads):
+        elapsed = time.perf_counter() - start
+        print(f"[{elapsed:6.2f}s] {name}: " + (f"❌ {error}" if error else f"{result['class']} ({result['confidence']}%)"))
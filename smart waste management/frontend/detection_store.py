@@ -0,0 +1,161 @@
+import math
+import sqlite3
+import threading
+
+# Persistent detection store: one SQLite file with a `detections` table and an
+# R-tree over (latitude, longitude), so viewport queries only touch the rows
+# inside the visible box. SQLite builds without the R-tree module fall back to
+# a plain (latitude, longitude) index.
+DEFAULT_DB_PATH = "detections.sqlite3"
+
+
+class DetectionStore:
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS detections ("
+            "id INTEGER PRIMARY KEY, class TEXT NOT NULL, confidence REAL NOT NULL, "
+            "time TEXT NOT NULL, latitude REAL NOT NULL, longitude REAL NOT NULL)"
+        )
+        try:
+            self._db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS detections_rtree "
+                "USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+            )
+            self.has_rtree = True
+        except sqlite3.OperationalError:
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_detections_lat_lon ON detections (latitude, longitude)")
+            self.has_rtree = False
+        self._db.commit()
+
+    # === Writes ===
+    def add(self, detection):
+        return self.add_many([detection])[0]
+
+    def add_many(self, detections):
+        ids = []
+        with self._lock, self._db:
+            for det in detections:
+                cursor = self._db.execute(
+                    "INSERT INTO detections (class, confidence, time, latitude, longitude) VALUES (?, ?, ?, ?, ?)",
+                    (det["class"], det["confidence"], det["time"], det["latitude"], det["longitude"]),
+                )
+                if self.has_rtree:
+                    self._db.execute(
+                        "INSERT INTO detections_rtree VALUES (?, ?, ?, ?, ?)",
+                        (cursor.lastrowid, det["latitude"], det["latitude"], det["longitude"], det["longitude"]),
+                    )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    # === Viewport queries: (south, west, north, east) in degrees ===
+    # Returns the FROM/WHERE clause plus the latitude/longitude columns to use.
+    # With `rows=False` only the R-tree is read: its float32 coordinates are
+    # plenty for counts and aggregates and skip the join with the table.
+    def _bbox_source(self, bounds, rows=True):
+        south, west, north, east = bounds
+        if not self.has_rtree:
+            return (
+                "detections d WHERE d.latitude BETWEEN ? AND ? AND d.longitude BETWEEN ? AND ?",
+                (south, north, west, east), "d.latitude", "d.longitude",
+            )
+        where = "WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?"
+        source = "detections_rtree r JOIN detections d ON d.id = r.id " if rows else "detections_rtree r "
+        return source + where, (south, north, west, east), "r.min_lat", "r.min_lon"
+
+    def count(self, bounds=None):
+        with self._lock:
+            if bounds is None:
+                return self._db.execute("SELECT COUNT(*) FROM detections").fetchone()[0]
+            source, params, _, _ = self._bbox_source(bounds, rows=False)
+            return self._db.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+
+    def query(self, bounds, limit=None):
+        source, params, _, _ = self._bbox_source(bounds)
+        sql = f"SELECT d.* FROM {source}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    # Grid aggregation inside SQLite: one row per non-empty cell with its
+    # detection count and mean position
+    def aggregate(self, bounds, cell_deg):
+        source, params, lat, lon = self._bbox_source(bounds, rows=False)
+        sql = (
+            f"SELECT COUNT(*) AS count, AVG({lat}) AS latitude, AVG({lon}) AS longitude "
+            f"FROM {source} "
+            f"GROUP BY CAST(({lat} + 90) / ? AS INTEGER), CAST(({lon} + 180) / ? AS INTEGER)"
+        )
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, (*params, cell_deg, cell_deg))]
+
+    def latest(self):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM detections ORDER BY id DESC LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# === Web-mercator helpers for the map viewport ===
+# Approximate (south, west, north, east) box shown by a width x height pixel map
+def viewport_around(lat, lon, zoom, width=700, height=500):
+    deg_per_px = 360.0 / (256 * 2 ** zoom)
+    half_lon = width / 2 * deg_per_px
+    half_lat = height / 2 * deg_per_px * math.cos(math.radians(lat))
+    return (max(lat - half_lat, -90.0), lon - half_lon, min(lat + half_lat, 90.0), lon + half_lon)
+
+
+# Grid cell size that splits the viewport into about `cells` columns
+def cell_size(bounds, cells=64):
+    south, west, north, east = bounds
+    return max(east - west, north - south, 1e-6) / cells
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+    import time
+
+    # Demo: 100k detections scattered over a city, then the two viewport queries the map runs
+    db_path = os.path.join(tempfile.mkdtemp(), "detections_demo.sqlite3")
+    store = DetectionStore(db_path)
+    rng = random.Random(0)
+    classes = ["cardboard", "glass", "metal", "paper", "plastic", "trash"]
+    center_lat, center_lon = 41.8781, -87.6298  # Chicago
+
+    start = time.perf_counter()
+    store.add_many(
+        {
+            "class": rng.choice(classes),
+            "confidence": rng.uniform(50, 100),
+            "time": "2024-01-01 12:00:00",
+            "latitude": rng.gauss(center_lat, 0.08),
+            "longitude": rng.gauss(center_lon, 0.1),
+        }
+        for _ in range(100_000)
+    )
+    print(f"📥 Inserted {store.count()} detections in {time.perf_counter() - start:.2f}s (R-tree: {store.has_rtree})")
+
+    for zoom in (11, 13, 16):
+        bounds = viewport_around(center_lat, center_lon, zoom)
+        start = time.perf_counter()
+        n = store.count(bounds)
+        cells = store.aggregate(bounds, cell_size(bounds))
+        aggregate_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        points = store.query(bounds, limit=500)
+        query_ms = (time.perf_counter() - start) * 1000
+        print(f"🗺️ zoom {zoom}: {n} in view -> {len(cells)} cells in {aggregate_ms:.1f} ms, "
+              f"{len(points)} markers in {query_ms:.1f} ms")
+
+    store.close()
@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the repository root to system path for the shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.image_preprocessing import decode_image_bytes, resize_into
+
+IMG_SIZE = 128
+SHARD_SIZE = 1024
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif")
+INDEX_FILE = "index.json"
+SHARD_VERSION = 2  # bump when decode/resize changes so old shards are rebuilt
+
+# Shard layout: shard-00000.npy, shard-00001.npy, ... are fixed-size
+# (SHARD_SIZE,128,128,3) uint8 arrays filled in order, so sample i lives at
+# shard i // shard_size, slot i % shard_size. index.json records the class
+# names, the preprocessing version and one [path, label, mtime_ns, size]
+# entry per packed sample, plus the same entry for every file that failed to
+# decode ("skipped"), so unchanged bad files are not retried on every run.
+
+
+def _shard_path(shard_dir, shard):
+    return os.path.join(shard_dir, f"shard-{shard:05d}.npy")
+
+
+def _scan(dataset_path):
+    class_names = sorted(d for d in os.listdir(dataset_path) if os.path.isdir(os.path.join(dataset_path, d)))
+    files = []
+    for label, class_name in enumerate(class_names):
+        class_dir = os.path.join(dataset_path, class_name)
+        for f in sorted(os.listdir(class_dir)):
+            if f.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(class_dir, f)
+                stat = os.stat(path)
+                files.append([path, label, stat.st_mtime_ns, stat.st_size])
+    return class_names, files
+
+
+# Same decode + resize as the backend (shared/image_preprocessing.py)
+def _decode(path):
+    with open(path, "rb") as f:
+        image = decode_image_bytes(f.read())
+    return resize_into(image, np.empty((IMG_SIZE, IMG_SIZE, 3), dtype=np.uint8))
+
+
+def _load_index(shard_dir):
+    index_path = os.path.join(shard_dir, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, "r") as f:
+        return json.load(f)
+
+
+def _save_index(shard_dir, index):
+    tmp_path = os.path.join(shard_dir, INDEX_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, os.path.join(shard_dir, INDEX_FILE))
+
+
+# === One-time packer; later runs only append files added to class folders ===
+# If a packed file was changed or removed, or the class folders changed, the
+# shards are rebuilt from scratch so labels and pixels never go stale.
+def pack_shards(dataset_path, shard_dir, shard_size=SHARD_SIZE, workers=8):
+    class_names, files = _scan(dataset_path)
+    os.makedirs(shard_dir, exist_ok=True)
+
+    index = _load_index(shard_dir)
+    rebuild = (
+        index is None
+        or index.get("version") != SHARD_VERSION
+        or index["class_names"] != class_names
+        or index["shard_size"] != shard_size
+    )
+    if not rebuild:
+        current = {path: [label, mtime, size] for path, label, mtime, size in files}
+        rebuild = any(current.get(path) != [label, mtime, size] for path, label, mtime, size in index["files"])
+
+    if rebuild:
+        for f in os.listdir(shard_dir):
+            if f.startswith("shard-") and f.endswith(".npy"):
+                os.remove(os.path.join(shard_dir, f))
+        index = {"version": SHARD_VERSION, "class_names": class_names, "shard_size": shard_size,
+                 "files": [], "skipped": []}
+        new_files = files
+        print(f"📦 Packing {len(new_files)} images into {shard_dir}...")
+    else:
+        # A skipped file is retried only once it changes (or comes back)
+        current = {entry[0]: entry for entry in files}
+        index["skipped"] = [entry for entry in index.get("skipped", []) if current.get(entry[0]) == entry]
+        done = {entry[0] for entry in index["files"]} | {entry[0] for entry in index["skipped"]}
+        new_files = [entry for entry in files if entry[0] not in done]
+        if not new_files:
+            _save_index(shard_dir, index)
+            print(f"✅ Shards in {shard_dir} are up to date ({len(index['files'])} images, "
+                  f"{len(index['skipped'])} unreadable)")
+            return index
+        print(f"📦 Appending {len(new_files)} new images to {shard_dir}...")
+
+    skipped = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Decode one shard's worth of new files at a time and write it into place
+        position = 0
+        while position < len(new_files):
+            shard, slot = divmod(len(index["files"]), shard_size)
+            chunk = new_files[position:position + (shard_size - slot)]
+            position += len(chunk)
+
+            path = _shard_path(shard_dir, shard)
+            if os.path.exists(path):
+                shard_array = np.load(path, mmap_mode="r+")
+            else:
+                shard_array = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8,
+                                                        shape=(shard_size, IMG_SIZE, IMG_SIZE, 3))
+
+            futures = [pool.submit(_decode, entry[0]) for entry in chunk]
+            for entry, future in zip(chunk, futures):
+                try:
+                    image = future.result()
+                except Exception as e:
+                    print(f"⚠️ Skipping {entry[0]}: {e}")
+                    index["skipped"].append(entry)
+                    skipped += 1
+                    continue
+                shard_array[len(index["files"]) % shard_size] = image
+                index["files"].append(entry)
+
+            shard_array.flush()
+            del shard_array
+            _save_index(shard_dir, index)
+
+    _save_index(shard_dir, index)  # also covers an empty dataset or a run where every file was skipped
+    print(f"✅ {len(index['files'])} images packed in {shard_dir}" + (f" ({skipped} skipped)" if skipped else ""))
+    return index
+
+
+# === Random-access reader over the memory-mapped shards ===
+class ShardReader:
+    def __init__(self, shard_dir):
+        index = _load_index(shard_dir)
+        if index is None:
+            raise FileNotFoundError(f"No shard index in {shard_dir}; run pack_shards first.")
+
+        self.class_names = index["class_names"]
+        self.shard_size = index["shard_size"]
+        self.paths = [entry[0] for entry in index["files"]]
+        self.labels = np.array([entry[1] for entry in index["files"]], dtype=np.int64)
+
+        n_shards = (len(self.paths) + self.shard_size - 1) // self.shard_size
+        self.shards = [np.load(_shard_path(shard_dir, shard), mmap_mode="r") for shard in range(n_shards)]
+
+    def __len__(self):
+        return len(self.paths)
+
+    # Read many samples; reads are grouped per shard and in slot order
+    def gather(self, indices):
+        indices = np.asarray(indices, dtype=np.int64)
+        out = np.empty((len(indices), IMG_SIZE, IMG_SIZE, 3), dtype=np.uint8)
+        shard_ids, slots = np.divmod(indices, self.shard_size)
+        for shard in np.unique(shard_ids):
+            positions = np.flatnonzero(shard_ids == shard)
+            order = positions[np.argsort(slots[positions])]
+            out[order] = self.shards[shard][slots[order]]
+        return out
+
+    # Same per-class split as data_pipeline.split_files: first 20% of each
+    # sorted class folder is validation
+    def split(self, validation_split=0.2):
+        train, val = [], []
+        for label in range(len(self.class_names)):
+            ids = np.flatnonzero(self.labels == label)
+            ids = ids[np.argsort([self.paths[i] for i in ids])]
+            n_val = int(validation_split * len(ids))
+            val.append(ids[:n_val])
+            train.append(ids[n_val:])
+        return np.concatenate(train), np.concatenate(val)
@@ -1,43 +1,44 @@
 import os
 import tensorflow as tf
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout
 from tensorflow.keras.callbacks import ModelCheckpoint
+from data_pipeline import list_classes, split_files, make_dataset, make_shard_dataset, ThroughputLogger
+from shards import pack_shards, ShardReader
 
 # Paths
 DATASET_PATH = r"D:\smart waste management\archive (1)\TrashType_Image_Dataset"  # inside training/
 IMG_SIZE = 128
 BATCH_SIZE = 32
 EPOCHS = 10
-
-# Data Augmentation
-datagen = ImageDataGenerator(
-    rescale=1./255,
-    validation_split=0.2,
-    rotation_range=20,
-    zoom_range=0.2,
-    horizontal_flip=True
-)
+USE_SHARDS = True       # train from pre-decoded uint8 shards (see shards.py)
+SHARD_DIR = "shards"
+CACHE_DIR = "tf_cache"  # raw-file mode: decoded + resized images are cached here after the first epoch
+SEED = 42
 
 # Load Training & Validation sets
-train_gen = datagen.flow_from_directory(
-    DATASET_PATH,
-    target_size=(IMG_SIZE, IMG_SIZE),
-    batch_size=BATCH_SIZE,
-    class_mode='categorical',
-    subset='training',
-    shuffle=True
-)
+if USE_SHARDS:
+    # Packs once, then only appends images added to the class folders
+    pack_shards(DATASET_PATH, SHARD_DIR)
+    reader = ShardReader(SHARD_DIR)
+    class_names = reader.class_names
+    train_ids, val_ids = reader.split(validation_split=0.2)
+    num_train = len(train_ids)
+    print(f"Found {len(train_ids)} training and {len(val_ids)} validation images in {len(class_names)} classes.")
+
+    train_ds = make_shard_dataset(reader, train_ids, BATCH_SIZE, training=True, seed=SEED)
+    val_ds = make_shard_dataset(reader, val_ids, BATCH_SIZE, training=False)
+else:
+    # tf.data over the raw files: parallel decode, file cache, prefetch
+    class_names = list_classes(DATASET_PATH)
+    train_files, val_files = split_files(DATASET_PATH, class_names, validation_split=0.2)
+    num_train = len(train_files)
+    print(f"Found {len(train_files)} training and {len(val_files)} validation images in {len(class_names)} classes.")
 
-val_gen = datagen.flow_from_directory(
-    DATASET_PATH,
-    target_size=(IMG_SIZE, IMG_SIZE),
-    batch_size=BATCH_SIZE,
-    class_mode='categorical',
-    subset='validation',
-    shuffle=True
-)
+    train_ds = make_dataset(train_files, len(class_names), BATCH_SIZE, training=True,
+                            cache_dir=CACHE_DIR, name="train", seed=SEED)
+    val_ds = make_dataset(val_files, len(class_names), BATCH_SIZE, training=False,
+                          cache_dir=CACHE_DIR, name="val")
 
 # Build CNN model
 model = Sequential([
@@ -50,7 +51,7 @@ model = Sequential([
     Flatten(),
     Dense(128, activation='relu'),
     Dropout(0.4),
-    Dense(train_gen.num_classes, activation='softmax')
+    Dense(len(class_names), activation='softmax')
 ])
 
 model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
@@ -60,9 +61,10 @@ os.makedirs("model", exist_ok=True)
 checkpoint = ModelCheckpoint("model/waste_classifier.h5", monitor="val_accuracy", save_best_only=True, mode="max")
 
 # Train
-model.fit(train_gen, validation_data=val_gen, epochs=EPOCHS, callbacks=[checkpoint])
+model.fit(train_ds, validation_data=val_ds, epochs=EPOCHS,
+          callbacks=[checkpoint, ThroughputLogger(num_train)])
 
 # Save class labels
 with open("model/class_names.txt", "w") as f:
-    for class_name in train_gen.class_indices:
+    for class_name in class_names:
         f.write(f"{class_name}\n")